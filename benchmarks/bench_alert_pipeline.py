@@ -0,0 +1,156 @@
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+from datetime import datetime, timedelta
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "traffic-alerts"))
+from event_store import load_index, load_window
+from event_archive import EventArchive, write_archive
+from alerts import daily_summary, weekly_summary, weekly_digest
+import render
+from overlap import hourly_load
+from synthetic import write_months
+
+
+# Times each stage of the alert pipeline on synthetic month CSVs, without Discord or
+# network. Every run is appended to history.jsonl, and compared with the last run
+# that used the same parameters so slowdowns stand out.
+#
+#   python benchmarks/bench_alert_pipeline.py --years 5 --events-per-day 3 [--check]
+
+HISTORY_FILE = os.path.join(HERE, "history.jsonl")
+
+# A stage counts as regressed when it's this much slower than the previous run
+REGRESSION_RATIO = 1.25
+
+
+def best_of(repeat, fn, *args):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+def every_day(start_year, years):
+    day = datetime(start_year, 1, 1, 9)
+    end = datetime(start_year + years, 1, 1)
+    while day < end:
+        yield day
+        day += timedelta(days=1)
+
+def run_stages(folder, start_year, years, repeat):
+    stages = {}
+    days = list(every_day(start_year, years))
+
+    stages["load_parse"], index = best_of(repeat, load_index, folder, None)
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache_file = os.path.join(cache_dir, "events.pickle")
+        load_index(folder, cache_file)
+        stages["load_cached"], _ = best_of(repeat, load_index, folder, cache_file)
+
+    # Opening the binary archive, and turning it into an index
+    with tempfile.TemporaryDirectory() as archive_dir:
+        archive_file = os.path.join(archive_dir, "events.archive")
+        write_archive(folder, archive_file)
+        stages["archive_open"], archive = best_of(repeat, EventArchive, archive_file)
+        stages["archive_index"], _ = best_of(repeat, archive.index)
+        archive.close()
+
+    # Reading just the month files a weekly window needs, once a week
+    def window_loads():
+        return sum(len(load_window(folder, day, day + timedelta(days=5))) for day in days[::7])
+    stages["window_load"], _ = best_of(repeat, window_loads)
+
+    def filter_windows():
+        return sum(len(index.between(day + timedelta(days=1), day + timedelta(days=5))) for day in days)
+    stages["filter"], _ = best_of(repeat, filter_windows)
+
+    # Peak crowd load for every hour of the whole data set in one sweep
+    stages["overlap"], _ = best_of(repeat, hourly_load, index, days[0], days[-1])
+
+    def summaries():
+        return [daily_summary(index, day) for day in days] + [weekly_summary(index, day) for day in days]
+    stages["summary"], all_lines = best_of(repeat, summaries)
+
+    def format_messages():
+        return sum(len(render.chunk_message(lines)) for lines in all_lines)
+    stages["format"], _ = best_of(repeat, format_messages)
+
+    # Every weekly summary in every output format, starting from empty render caches.
+    # Neighbouring weeks share most of their days, so most blocks are only looked up.
+    digests = [weekly_digest(index, day) for day in days]
+    def render_formats():
+        for cached in (render.render_block, render.render_lines, render.discord_chunks):
+            cached.cache_clear()
+        for digest in digests:
+            render.discord_chunks(digest)
+            for fmt in render.FORMATS:
+                render.render(digest, fmt)
+    stages["render_formats"], _ = best_of(repeat, render_formats)
+
+    return len(index), stages
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def previous_run(params):
+    try:
+        with open(HISTORY_FILE, "r") as f:
+            runs = [json.loads(line) for line in f if line.strip()]
+    except OSError:
+        return None
+    matching = [run for run in runs if run["params"] == params]
+    return matching[-1] if matching else None
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the alert pipeline on synthetic data")
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--events-per-day", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-save", action="store_true", help="don't append this run to the history")
+    parser.add_argument("--check", action="store_true", help="exit with status 1 if any stage regressed")
+    args = parser.parse_args()
+
+    start_year = 2000
+    params = {"years": args.years, "events_per_day": args.events_per_day}
+
+    with tempfile.TemporaryDirectory() as folder:
+        write_months(folder, start_year, args.years, args.events_per_day)
+        rows, stages = run_stages(folder, start_year, args.years, args.repeat)
+
+    previous = previous_run(params)
+    regressed = []
+    print(f"{rows} events over {args.years} years")
+    print(f"{'Stage':<12} {'ms':>10} {'previous':>10}")
+    for stage, seconds in stages.items():
+        line = f"{stage:<12} {seconds * 1000:>10.2f}"
+        if previous and stage in previous["stages"]:
+            before = previous["stages"][stage]
+            line += f" {before * 1000:>10.2f}"
+            if before and seconds / before > REGRESSION_RATIO:
+                line += "  REGRESSION"
+                regressed.append(stage)
+        print(line)
+
+    if not args.no_save:
+        run = {"time": datetime.now().isoformat(timespec="seconds"), "commit": git_commit(),
+               "params": params, "rows": rows, "stages": stages}
+        with open(HISTORY_FILE, "a") as f:
+            f.write(json.dumps(run) + "\n")
+
+    if args.check and regressed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
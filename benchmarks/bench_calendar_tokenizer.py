@@ -0,0 +1,64 @@
+import os
+import sys
+import time
+import random
+import calendar
+
+# The tokenizer lives with the other calendar parsing code
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "working"))
+from calendar_tokenizer import HEADER, CalendarEntry, tokenize_entries
+
+
+# Times tokenize_entries over synthetic calendar text for growing numbers of years.
+# The per-entry cost should stay flat as the input grows.
+#
+#   python benchmarks/bench_calendar_tokenizer.py [max_years]
+
+EVENTS = [
+    ("CBP", "PHILLIES vs Rockies", 43000),
+    ("LFF", "EAGLES vs Giants", 69000),
+    ("XMA", "FLYERS vs Hurricanes", 19000),
+    ("XMA", "SIXERS vs Knicks", 20000),
+    ("Citizens Bank Park", "Morgan Wallen Concert", 45000),
+    ("SL!", "Taking Back Sunday Concert", 5000),
+]
+TIMES = ["1:05 PM", "6:40 PM", "7:00pm", "8 PM", "6:30 PM - 9:30 PM"]
+
+
+def synthetic_month(rng, year, month):
+    lines = [f"{calendar.month_name[month].upper()} {year}", HEADER]
+    for day in range(1, calendar.monthrange(year, month)[1] + 1):
+        entries = []
+        for _ in range(rng.choice([0, 1, 1, 2, 3])):
+            venue, name, attendance = rng.choice(EVENTS)
+            entries.append(f"{rng.choice(TIMES)} {venue} {name} ({attendance:,})")
+        lines.append(f"{day} " + "\n".join(entries))
+    return "\n".join(lines)
+
+def synthetic_text(years, seed=0):
+    # One header at the top, then every month's entries back to back
+    rng = random.Random(seed)
+    months = [synthetic_month(rng, 2000 + i // 12, i % 12 + 1) for i in range(years * 12)]
+    return months[0] + "\n" + "\n".join(m.split(HEADER, 1)[1] for m in months[1:])
+
+def bench(text, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        records = list(tokenize_entries(text))
+        best = min(best, time.perf_counter() - started)
+    entries = sum(isinstance(r, CalendarEntry) for r in records)
+    return best, entries, len(records) - entries
+
+def main():
+    max_years = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    print(f"{'Years':>5} {'Chars':>10} {'Entries':>8} {'Failures':>8} {'Total ms':>9} {'us/entry':>9}")
+    years = 1
+    while years <= max_years:
+        text = synthetic_text(years)
+        elapsed, entries, failures = bench(text)
+        print(f"{years:>5} {len(text):>10} {entries:>8} {failures:>8} {elapsed * 1000:>9.1f} {elapsed / max(entries, 1) * 1e6:>9.2f}")
+        years *= 2
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import os
+import sys
+import time
+import argparse
+import tempfile
+import subprocess
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+from synthetic import write_months
+
+
+# Measures how long `stadium-events.py` takes to start and answer an offline dry run,
+# and checks that it stays within budget without importing the heavy modules.
+#
+#   python benchmarks/bench_cli_startup.py [--repeat 10] [--check]
+
+CLI = os.path.join(HERE, "..", "stadium-events.py")
+
+# Best-of wall time allowed for each command, in milliseconds. The interpreter alone
+# takes a good part of this.
+STARTUP_BUDGET_MS = {
+    "help": 120,
+    "daily": 150,
+    "weekly": 150,
+}
+
+# None of these should be imported to print a summary from cached data
+HEAVY_MODULES = ("discord", "aiohttp", "numpy", "requests", "pdfplumber")
+
+COMMANDS = {
+    "help": ["--help"],
+    "daily": ["daily", "--offline", "--dry-run", "--date", "2000-07-04"],
+    "weekly": ["weekly", "--offline", "--dry-run", "--date", "2000-07-04"],
+}
+
+
+def run_cli(args, cwd, *python_flags):
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, *python_flags, CLI, *args], cwd=cwd, capture_output=True, text=True)
+    elapsed = time.perf_counter() - started
+    if result.returncode != 0:
+        raise SystemExit(f"stadium-events {' '.join(args)} failed:\n{result.stderr}")
+    return elapsed, result.stderr
+
+def heavy_imports(importtime_output):
+    # -X importtime lines end in "|   <indent><module name>"
+    imported = {line.rsplit("|", 1)[-1].strip() for line in importtime_output.splitlines()}
+    return sorted(m for m in imported if m.split(".")[0] in HEAVY_MODULES)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the CLI's startup time")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--check", action="store_true", help="exit with status 1 if over budget")
+    args = parser.parse_args()
+
+    failed = False
+    with tempfile.TemporaryDirectory() as folder:
+        csv_folder = os.path.join(folder, "calendars-git")
+        os.makedirs(csv_folder)
+        write_months(csv_folder, 2000, 1, 3)
+
+        print(f"{'Command':<8} {'ms':>8} {'budget':>8}")
+        for name, command in COMMANDS.items():
+            if name != "help":
+                command = command + ["--csv-folder", csv_folder]
+                # First run fills the event and rollup caches, like yesterday's run would have
+                run_cli(command, folder)
+            best = min(run_cli(command, folder)[0] for _ in range(args.repeat)) * 1000
+            line = f"{name:<8} {best:>8.1f} {STARTUP_BUDGET_MS[name]:>8}"
+            if best > STARTUP_BUDGET_MS[name]:
+                line += "  OVER BUDGET"
+                failed = True
+            heavy = heavy_imports(run_cli(command, folder, "-X", "importtime")[1])
+            if heavy:
+                line += f"  imported {', '.join(heavy)}"
+                failed = True
+            print(line)
+
+    if args.check and failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import io
+import os
+import sys
+import csv
+import time
+import random
+from datetime import date, datetime
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "traffic-alerts"))
+import normalize
+from normalize import normalize_month
+from synthetic import CSV_FIELDS, month_rows
+
+
+# Per-row cost of turning a month CSV into event tuples, on one synthetic month with
+# more and more events per day. "per_row" is the old row-at-a-time path (DictReader,
+# four str.replace calls and strptime for every row), "batch" is normalize_month with
+# its lookup tables emptied before every run.
+#
+#   python benchmarks/bench_normalize.py [max_events_per_day]
+
+def per_row(text, year, month):
+    rows = []
+    for row in csv.DictReader(io.StringIO(text, newline="")):
+        try:
+            event_date = date(year, month, int(row["Date"]))
+            attendance = int(row["Attendance"])
+        except (TypeError, ValueError):
+            continue
+        name = row["Event Name"]
+        for shouted, team in normalize.TEAM_NAMES.items():
+            name = name.replace(shouted, team)
+        time_str = row["Time"].lower().replace(" ", "")
+        minute = normalize.NO_TIME
+        for fmt in ("%I:%M%p", "%I%p"):
+            try:
+                parsed = datetime.strptime(time_str, fmt)
+            except ValueError:
+                continue
+            minute = parsed.hour * 60 + parsed.minute
+            break
+        rows.append((event_date, time_str, minute, row["Location"], name.split(">>>")[0].strip(), attendance))
+    return rows
+
+def batch(text, year, month):
+    for table in (normalize._names, normalize._times, normalize._venues):
+        table.clear()
+    return list(normalize_month(csv.reader(io.StringIO(text, newline="")), year, month))
+
+def month_text(events_per_day, year=2000, month=7):
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=CSV_FIELDS, lineterminator="\n")
+    writer.writeheader()
+    writer.writerows(month_rows(random.Random(0), year, month, events_per_day))
+    return out.getvalue()
+
+def bench(fn, text, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        rows = fn(text, 2000, 7)
+        best = min(best, time.perf_counter() - started)
+    return best, rows
+
+def main():
+    max_per_day = int(sys.argv[1]) if len(sys.argv) > 1 else 1024
+    print(f"{'Per day':>7} {'Rows':>8} {'per_row us':>10} {'batch us':>9} {'Speedup':>7}")
+    per_day = 4
+    while per_day <= max_per_day:
+        text = month_text(per_day)
+        slow, expected = bench(per_row, text)
+        fast, rows = bench(batch, text)
+        assert rows == expected, "normalize_month disagrees with the per-row path"
+        count = max(len(rows), 1)
+        print(f"{per_day:>7} {len(rows):>8} {slow / count * 1e6:>10.2f} {fast / count * 1e6:>9.2f} {slow / fast:>6.1f}x")
+        per_day *= 4
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import os
+import csv
+import random
+import calendar
+
+
+# Generates month CSVs in the same layout as the real ones, for benchmarks.
+
+VENUES = ["CBP", "LFF", "XMA", "WFC", "SL!"]
+EVENT_NAMES = {
+    "CBP": ["PHILLIES vs Rockies", "PHILLIES vs Mets", "Morgan Wallen Concert"],
+    "LFF": ["EAGLES vs Giants", "EAGLES vs Cowboys", "Union vs Red Bulls >>> moved to Subaru Park"],
+    "XMA": ["FLYERS vs Hurricanes", "SIXERS vs Knicks", "Disturbed Concert"],
+    "WFC": ["FLYERS vs Devils", "SIXERS vs Celtics"],
+    "SL!": ["Taking Back Sunday Concert", "Watch Party"],
+}
+ATTENDANCE = {"CBP": 43000, "LFF": 69000, "XMA": 19000, "WFC": 19000, "SL!": 5000}
+TIMES = ["1:05 PM", "3:00pm", "6:40pm", "7:00 PM", "7:30 pm", "8pm", "TBA"]
+
+CSV_FIELDS = ["Date", "Time", "Location", "Event Name", "Attendance"]
+
+
+def month_rows(rng, year, month, events_per_day):
+    rows = []
+    for day in range(1, calendar.monthrange(year, month)[1] + 1):
+        # Dense days get events_per_day on average, some days get none
+        for _ in range(rng.randint(0, events_per_day * 2)):
+            venue = rng.choice(VENUES)
+            rows.append({
+                "Date": day,
+                "Time": rng.choice(TIMES),
+                "Location": venue,
+                "Event Name": rng.choice(EVENT_NAMES[venue]),
+                "Attendance": ATTENDANCE[venue],
+            })
+    return rows
+
+def write_months(folder, start_year=2000, years=1, events_per_day=2, seed=0):
+    """Writes years * 12 YYYY-MM.csv files into folder and returns how many rows they hold."""
+    rng = random.Random(seed)
+    os.makedirs(folder, exist_ok=True)
+    total = 0
+    for i in range(years * 12):
+        year, month = start_year + i // 12, i % 12 + 1
+        rows = month_rows(rng, year, month, events_per_day)
+        with open(os.path.join(folder, f"{year}-{month:02d}.csv"), "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=CSV_FIELDS, lineterminator="\n")
+            writer.writeheader()
+            writer.writerows(rows)
+        total += len(rows)
+    return total
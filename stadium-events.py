@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+import os
+import sys
+import argparse
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "traffic-alerts"))
+sys.path.insert(0, os.path.join(HERE, "working"))
+
+
+# One entry point for the alert scripts and the PDF tools:
+#
+#   python stadium-events.py daily [--offline] [--dry-run] [--date 2026-05-08]
+#   python stadium-events.py weekly [--offline] [--dry-run] [--date 2026-05-08] [--format html]
+#   python stadium-events.py fetch [--dry-run]
+#   python stadium-events.py parse calendars/May2026_v2.pdf 05/2026 [2026-05.csv]
+#   python stadium-events.py archive [--export folder]
+#   python stadium-events.py forecast [--date 2026-09-12] [--offline]
+#   python stadium-events.py validate [--offline]
+#
+# Only argparse is imported up front and every command imports what it needs when it
+# runs, so e.g. `daily --offline --dry-run` never loads discord.py or aiohttp, and
+# doesn't load numpy either once the rollups are cached. --offline skips the git sync,
+# --dry-run prints instead of sending. benchmarks/bench_cli_startup.py keeps an eye on
+# how long that takes.
+
+# Folder containing the CSV files from the GitHub repo
+CSV_FOLDER = "./calendars-git"
+
+# Set STADIUM_EVENTS_REPO to a local repo path to sync from it instead
+REPO_URL = os.environ.get("STADIUM_EVENTS_REPO", "https://github.com/emilyboda/PhiladelphiaStadiumEvents.git")
+
+# Discord settings come from the environment so the CLI itself never needs editing
+DISCORD_TOKEN = os.environ.get("STADIUM_EVENTS_DISCORD_TOKEN", "YOUR_DISCORD_BOT_TOKEN")
+CHANNEL_ID = os.environ.get("STADIUM_EVENTS_CHANNEL")
+CHANNEL_ID_debugging = os.environ.get("STADIUM_EVENTS_DEBUG_CHANNEL")
+
+
+def run_summary(args):
+    from datetime import datetime
+    from instrument import span
+    from event_store import load_index
+    from rollups import load_rollups
+    from alerts import daily_digest, weekly_digest
+    from render import render, render_lines
+    from validate import validate_folder, errors, format_issue
+
+    if not args.offline:
+        from data_sync import sync_calendars
+        with span("sync_calendars"):
+            sync_calendars(REPO_URL, args.csv_folder)
+    # Only months that changed since the last run get read here
+    with span("validate"):
+        problems = errors(validate_folder(args.csv_folder))
+    for issue in problems:
+        print(format_issue(issue), file=sys.stderr)
+
+    now = datetime.now()
+    today = datetime.combine(args.date, now.time()) if args.date else now
+
+    with span("load_index"):
+        index = load_index(args.csv_folder)
+    with span("load_rollups"):
+        rollups = load_rollups(index)
+    build = daily_digest if args.command == "daily" else weekly_digest
+    with span(build.__name__):
+        digest = build(index, today, rollups)
+        summary_lines = render_lines(digest)
+
+    if summary_lines:
+        print(render(digest, args.format))
+    if args.command == "daily" and not summary_lines:
+        print("No disruptive events today")
+
+    if args.dry_run or DISCORD_TOKEN == "YOUR_DISCORD_BOT_TOKEN":
+        return
+
+    # Discord always gets markdown, --format only changes what's printed
+    from notifier import DiscordNotifier
+    notifier = DiscordNotifier(DISCORD_TOKEN)
+    if not summary_lines and args.debug_channel:
+        notifier.queue(args.debug_channel, f"{args.command} alert ran, no events today")
+    notifier.queue_summary(args.channel, digest)
+    notifier.send()
+
+def run_fetch(args):
+    import json
+    import runpy
+
+    links = runpy.run_path(os.path.join(HERE, "working", "1-get-pdf-links.py"))
+    calendar_links = links["fetch_calendar_links"](links["CALENDAR_PAGE_URL"])
+    if not calendar_links:
+        print("No calendar links found for this month or later.")
+        return
+    if args.dry_run:
+        for link in calendar_links:
+            print(f"{link['month']}: {link.get('url', 'no url')}")
+        return
+
+    with open("0-cal-urls.json", "w") as outfile:
+        json.dump(calendar_links, outfile, indent=2)
+    runpy.run_path(os.path.join(HERE, "working", "2-download-pdf-and-convert-to-png.py"), run_name="__main__")
+
+def run_parse(args):
+    from pdf_extract import extract_calendar, write_csv
+    from calendar_links import parse_calendar_month
+
+    year_month = parse_calendar_month(args.month)
+    if year_month is None:
+        sys.exit(f"Couldn't parse month '{args.month}'")
+    rows = extract_calendar(args.pdf, *year_month)
+    if args.dry_run:
+        for row in rows:
+            print(",".join(str(row[field]) for field in ("Date", "Time", "Location", "Event Name", "Attendance")))
+        return
+    csv_path = args.output or os.path.splitext(args.pdf)[0] + ".csv"
+    write_csv(rows, csv_path)
+    print(f"Wrote {len(rows)} events from {args.pdf} to {csv_path}")
+
+def run_archive(args):
+    from event_archive import ARCHIVE_FILE, EventArchive, write_archive
+
+    archive_path = args.archive or os.path.join(args.csv_folder, ARCHIVE_FILE)
+    if args.export:
+        with EventArchive(archive_path) as archive:
+            archive.export_csv(args.export)
+        print(f"Wrote {len(archive.months)} month files from {archive_path} to {args.export}")
+        return
+    rows = write_archive(args.csv_folder, archive_path)
+    print(f"Archived {rows} rows to {archive_path} ({os.path.getsize(archive_path):,} bytes)")
+
+def run_forecast(args):
+    from datetime import date, timedelta
+    from event_store import load_index
+    from normalize import LOCATION_MAP
+    from analytics import load_model, forecast, format_forecast
+
+    if not args.offline:
+        from data_sync import sync_calendars
+        sync_calendars(REPO_URL, args.csv_folder)
+    index = load_index(args.csv_folder)
+    # Next Saturday unless a date is given
+    today = date.today()
+    day = args.date or today + timedelta(days=(5 - today.weekday()) % 7 or 7)
+    for line in format_forecast(forecast(load_model(index), day, index), LOCATION_MAP):
+        print(line)
+
+def run_validate(args):
+    from validate import ERROR, validate_folder, format_issue
+
+    if not args.offline:
+        from data_sync import sync_calendars
+        sync_calendars(REPO_URL, args.csv_folder)
+    results = validate_folder(args.csv_folder)
+    issues = [issue for ym in sorted(results) for issue in results[ym]]
+    for issue in issues:
+        print(format_issue(issue))
+    error_count = sum(issue.severity == ERROR for issue in issues)
+    print(f"{len(results)} month files, {error_count} errors, {len(issues) - error_count} warnings")
+    if error_count:
+        sys.exit(1)
+
+def parse_date(value):
+    from datetime import date
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError("dates look like 2026-05-08")
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="stadium-events", description="Philadelphia stadium events tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    for name, help_text in (("daily", "today's early or large events"), ("weekly", "the next five days")):
+        command = commands.add_parser(name, help=f"summarize {help_text}")
+        command.add_argument("--csv-folder", default=CSV_FOLDER)
+        command.add_argument("--date", type=parse_date, help="pretend today is this date")
+        command.add_argument("--offline", action="store_true", help="use the CSVs already on disk, no git")
+        command.add_argument("--dry-run", action="store_true", help="print the summary without sending it")
+        command.add_argument("--format", choices=("markdown", "text", "html", "json"), default="markdown",
+                             help="how to print the summary")
+        command.add_argument("--channel", type=int, default=CHANNEL_ID)
+        command.add_argument("--debug-channel", type=int, default=CHANNEL_ID_debugging)
+        command.set_defaults(run=run_summary)
+
+    command = commands.add_parser("fetch", help="download new calendar PDFs and extract their events")
+    command.add_argument("--offline", action="store_true", help=argparse.SUPPRESS)
+    command.add_argument("--dry-run", action="store_true", help="only list the calendar links")
+    command.set_defaults(run=run_fetch)
+
+    command = commands.add_parser("parse", help="extract one calendar PDF to CSV")
+    command.add_argument("pdf")
+    command.add_argument("month", help="MM/YYYY or may2026")
+    command.add_argument("output", nargs="?")
+    command.add_argument("--offline", action="store_true", help=argparse.SUPPRESS)
+    command.add_argument("--dry-run", action="store_true", help="print the rows instead of writing them")
+    command.set_defaults(run=run_parse)
+
+    command = commands.add_parser("archive", help="pack the month CSVs into a binary archive, or unpack one")
+    command.add_argument("--csv-folder", default=CSV_FOLDER)
+    command.add_argument("--archive", help="archive path, events.archive in the CSV folder by default")
+    command.add_argument("--export", metavar="FOLDER", help="write the archived months back out as CSVs")
+    command.add_argument("--offline", action="store_true", help=argparse.SUPPRESS)
+    command.add_argument("--dry-run", action="store_true", help=argparse.SUPPRESS)
+    command.set_defaults(run=run_archive)
+
+    command = commands.add_parser("forecast", help="how busy a day is likely to be, from past seasons")
+    command.add_argument("--csv-folder", default=CSV_FOLDER)
+    command.add_argument("--date", type=parse_date, help="day to forecast, next Saturday by default")
+    command.add_argument("--offline", action="store_true", help="use the CSVs already on disk, no git")
+    command.add_argument("--dry-run", action="store_true", help=argparse.SUPPRESS)
+    command.set_defaults(run=run_forecast)
+
+    command = commands.add_parser("validate", help="check the month CSVs, exits 1 if any row has errors")
+    command.add_argument("--csv-folder", default=CSV_FOLDER)
+    command.add_argument("--offline", action="store_true", help="use the CSVs already on disk, no git")
+    command.add_argument("--dry-run", action="store_true", help=argparse.SUPPRESS)
+    command.set_defaults(run=run_validate)
+    return parser
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == "fetch" and args.offline:
+        parser.error("fetch needs the network, it can't run --offline")
+    if args.command in ("daily", "weekly") and not args.dry_run and DISCORD_TOKEN != "YOUR_DISCORD_BOT_TOKEN" and not args.channel:
+        parser.error("set --channel or STADIUM_EVENTS_CHANNEL to send, or use --dry-run")
+    args.run(args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+import os
+import sys
+import json
+import datetime
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "working"))
+from calendar_links import LinkCache, extract_links, fetch_links, parse_month_str, parse_calendar_month, upcoming_links
+
+
+FIXTURE = os.path.join(HERE, "..", "working", "fixtures", "sports-complex-info.html")
+PAGE_URL = "https://scssd.org/sports-complex-info/"
+
+FIXTURE_LINKS = [
+    {"month": "08/2026", "url": "https://scssd.org/wp-content/uploads/2026/07/Aug2026.pdf"},
+    {"month": "09/2026", "url": "https://scssd.org/wp-content/uploads/2026/08/Sept2026.pdf"},
+    {"month": "10/2026", "url": "https://scssd.org/wp-content/uploads/2026/10/Oct2026_v2.pdf"},
+    {"month": "nov2026", "url": "https://scssd.org/wp-content/uploads/2026/10/Nov2026.pdf"},
+]
+
+
+def read_fixture():
+    with open(FIXTURE, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+class StubResponse:
+    def __init__(self, status_code, text="", headers=None):
+        self.status_code = status_code
+        self.text = text
+        self.content = text.encode("utf-8")
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+
+class StubSession:
+    """Hands out the queued responses in order and keeps the headers of every request."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def get(self, url, headers=None, timeout=None):
+        self.requests.append(headers or {})
+        return self.responses.pop(0)
+
+
+def test_extract_links_from_fixture():
+    # December (in a <script>) and January (in an HTML attribute) have no PDF yet and are left out
+    assert extract_links(read_fixture()) == FIXTURE_LINKS
+
+def test_extract_links_falls_back_to_raw_text():
+    page = '<p>"month":"05\\/2026","pdf_file":{"url":"https:\\/\\/example.org\\/May2026.pdf"</p>}'
+    assert extract_links(page) == [{"month": "05/2026", "url": "https://example.org/May2026.pdf"}]
+
+def test_extract_links_without_entries():
+    assert extract_links("<html><body>No calendars</body></html>") == []
+
+
+def test_parse_month_str():
+    assert parse_month_str("08/2026") == datetime.datetime(2026, 8, 1)
+    assert parse_month_str("08\\/2026") == datetime.datetime(2026, 8, 1)
+    assert parse_month_str("nov2026") == datetime.datetime(2026, 11, 1)
+    assert parse_month_str("xyz2026") is None
+    assert parse_month_str("13/2026") is None
+    assert parse_month_str("aug") is None
+
+def test_parse_calendar_month():
+    assert parse_calendar_month("10/2026") == (2026, 10)
+    assert parse_calendar_month("jan2027") == (2027, 1)
+    assert parse_calendar_month("13/2026") is None
+    assert parse_calendar_month("") is None
+
+def test_upcoming_links_this_month_only():
+    links = extract_links(read_fixture())
+    assert upcoming_links(links, datetime.datetime(2026, 9, 10)) == FIXTURE_LINKS[1:2]
+
+def test_upcoming_links_includes_next_month_within_six_days():
+    links = extract_links(read_fixture())
+    upcoming = upcoming_links(links, datetime.datetime(2026, 10, 26))
+    assert upcoming == FIXTURE_LINKS[2:4]
+
+def test_upcoming_links_skips_past_and_unparseable_months():
+    links = [{"month": "07/2026", "url": "a.pdf"}, {"month": "someday", "url": "b.pdf"}, {"month": "08/2026", "url": "c.pdf"}]
+    assert upcoming_links(links, datetime.datetime(2026, 8, 1)) == [links[2]]
+
+
+def test_link_cache_save_and_load(tmp_path):
+    path = str(tmp_path / "links.json")
+    cache = LinkCache(path)
+    assert cache.links(PAGE_URL) is None
+    assert cache.conditional_headers(PAGE_URL) == {}
+
+    cache.record(PAGE_URL, FIXTURE_LINKS, "abc", etag='"v1"', last_modified="Mon, 05 Oct 2026 10:00:00 GMT")
+    reloaded = LinkCache(path)
+    assert reloaded.links(PAGE_URL) == FIXTURE_LINKS
+    assert reloaded.links(PAGE_URL, "abc") == FIXTURE_LINKS
+    assert reloaded.links(PAGE_URL, "different") is None
+    assert reloaded.conditional_headers(PAGE_URL) == {
+        "If-None-Match": '"v1"',
+        "If-Modified-Since": "Mon, 05 Oct 2026 10:00:00 GMT",
+    }
+    assert not os.path.exists(path + ".tmp")
+
+def test_link_cache_ignores_corrupt_file(tmp_path):
+    path = tmp_path / "links.json"
+    path.write_text("{not json")
+    assert LinkCache(str(path)).pages == {}
+
+
+def test_fetch_links_200_then_304(tmp_path):
+    cache = LinkCache(str(tmp_path / "links.json"))
+    page = read_fixture()
+    session = StubSession(
+        StubResponse(200, page, {"ETag": '"v1"', "Last-Modified": "Mon, 05 Oct 2026 10:00:00 GMT"}),
+        StubResponse(304),
+    )
+
+    first = fetch_links(session, PAGE_URL, cache)
+    assert first == FIXTURE_LINKS
+    assert session.requests[0] == {}
+
+    # The second fetch is conditional and the 304 reuses the stored links
+    second = fetch_links(session, PAGE_URL, cache)
+    assert second == first
+    assert session.requests[1] == {"If-None-Match": '"v1"', "If-Modified-Since": "Mon, 05 Oct 2026 10:00:00 GMT"}
+    assert session.responses == []
+
+def test_fetch_links_304_without_stored_links_refetches(tmp_path):
+    path = tmp_path / "links.json"
+    path.write_text(json.dumps({PAGE_URL: {"etag": '"v1"', "last_modified": None, "sha256": None, "links": None}}))
+    cache = LinkCache(str(path))
+    session = StubSession(StubResponse(304), StubResponse(200, read_fixture(), {"ETag": '"v2"'}))
+
+    links = fetch_links(session, PAGE_URL, cache)
+    assert links == FIXTURE_LINKS
+    # The retry is unconditional, and the new validators are kept
+    assert session.requests == [{"If-None-Match": '"v1"'}, {}]
+    assert LinkCache(str(path)).conditional_headers(PAGE_URL) == {"If-None-Match": '"v2"'}
+
+def test_fetch_links_same_body_skips_parsing(tmp_path, monkeypatch):
+    import calendar_links
+    cache = LinkCache(str(tmp_path / "links.json"))
+    page = read_fixture()
+    session = StubSession(StubResponse(200, page), StubResponse(200, page))
+    first = fetch_links(session, PAGE_URL, cache)
+
+    def fail(page):
+        raise AssertionError("an unchanged page shouldn't be parsed again")
+    monkeypatch.setattr(calendar_links, "extract_links", fail)
+    assert fetch_links(session, PAGE_URL, cache) == first
+
+def test_fetch_links_raises_on_server_error(tmp_path):
+    cache = LinkCache(str(tmp_path / "links.json"))
+    session = StubSession(StubResponse(500, "oops"))
+    with pytest.raises(RuntimeError):
+        fetch_links(session, PAGE_URL, cache)
+    assert cache.links(PAGE_URL) is None
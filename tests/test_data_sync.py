@@ -0,0 +1,103 @@
+import os
+import sys
+import time
+import shutil
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "traffic-alerts"))
+from data_sync import CHECK_STAMP, MIN_CHECK_INTERVAL, git, local_head, make_local_remote, sync_calendars
+
+
+HEADER = "Date,Time,Location,Event Name,Attendance\n"
+
+MONTHS = {
+    "2026-05.csv": HEADER + "5,6:40 pm,CBP,PHILLIES vs Athletics,40000\n",
+    "2026-06.csv": HEADER + "12,8:00 pm,LFF,Concert,60000\n",
+}
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="needs git")
+
+
+def write_files(folder, files):
+    for name, text in files.items():
+        with open(os.path.join(folder, name), "w", encoding="utf-8") as f:
+            f.write(text)
+
+def read_file(folder, name):
+    with open(os.path.join(folder, name), encoding="utf-8") as f:
+        return f.read()
+
+def commit(remote, files, message="Update calendars"):
+    """Commits files into the stand-in remote, as an upstream push would."""
+    write_files(remote, files)
+    git("add", "--all", cwd=remote)
+    git("-c", "user.name=local", "-c", "user.email=local@localhost", "commit", "--quiet", "-m", message, cwd=remote)
+    return git("rev-parse", "HEAD", cwd=remote)
+
+def age_check_stamp(clone, seconds):
+    stamp = os.path.join(clone, ".git", CHECK_STAMP)
+    then = time.time() - seconds
+    os.utime(stamp, (then, then))
+
+@pytest.fixture
+def remote(tmp_path):
+    source = tmp_path / "source"
+    source.mkdir()
+    write_files(source, MONTHS)
+    return make_local_remote(str(source), str(tmp_path / "remote"))
+
+@pytest.fixture
+def clone(tmp_path):
+    return str(tmp_path / "clone")
+
+
+def test_make_local_remote(remote):
+    assert sorted(name for name in os.listdir(remote) if name.endswith(".csv")) == sorted(MONTHS)
+    assert git("status", "--porcelain", cwd=remote) == ""
+
+def test_first_sync_clones_every_csv(remote, clone):
+    assert sync_calendars(remote, clone) == sorted(MONTHS)
+    for name, text in MONTHS.items():
+        assert read_file(clone, name) == text
+    assert local_head(clone) == git("rev-parse", "HEAD", cwd=remote)
+    assert os.path.exists(os.path.join(clone, ".git", CHECK_STAMP))
+
+def test_unchanged_remote_is_a_no_op(remote, clone):
+    sync_calendars(remote, clone)
+    head = local_head(clone)
+    assert sync_calendars(remote, clone, min_interval=0) == []
+    assert local_head(clone) == head
+
+def test_recent_check_skips_the_remote(remote, clone):
+    sync_calendars(remote, clone)
+    new_head = commit(remote, {"2026-05.csv": MONTHS["2026-05.csv"] + "9,1:05 pm,CBP,PHILLIES vs Mets,41000\n"})
+
+    # Within MIN_CHECK_INTERVAL of the clone the remote isn't even asked
+    assert sync_calendars(remote, clone) == []
+    assert local_head(clone) != new_head
+
+    # Once the last check is older than that, the new commit comes in
+    age_check_stamp(clone, MIN_CHECK_INTERVAL + 1)
+    assert sync_calendars(remote, clone) == ["2026-05.csv"]
+    assert local_head(clone) == new_head
+
+def test_remote_commit_returns_only_changed_months(remote, clone):
+    sync_calendars(remote, clone)
+    july = HEADER + "4,7:05 pm,CBP,PHILLIES vs Braves,45000\n"
+    may = MONTHS["2026-05.csv"].replace("40000", "42000")
+    commit(remote, {"2026-05.csv": may, "2026-07.csv": july, "README.md": "Calendars\n"})
+
+    assert sync_calendars(remote, clone, min_interval=0) == ["2026-05.csv", "2026-07.csv"]
+    assert read_file(clone, "2026-05.csv") == may
+    assert read_file(clone, "2026-06.csv") == MONTHS["2026-06.csv"]
+    assert read_file(clone, "2026-07.csv") == july
+    assert read_file(clone, "README.md") == "Calendars\n"
+
+def test_removed_month_is_reported(remote, clone):
+    sync_calendars(remote, clone)
+    git("rm", "--quiet", "2026-06.csv", cwd=remote)
+    commit(remote, {})
+
+    assert sync_calendars(remote, clone, min_interval=0) == ["2026-06.csv"]
+    assert not os.path.exists(os.path.join(clone, "2026-06.csv"))
@@ -0,0 +1,152 @@
+import os
+import sys
+import random
+import asyncio
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "traffic-alerts"))
+from notifier import FakeNotifier, WebhookNotifier
+from render import MESSAGE_LIMIT
+
+
+class SlowFakeNotifier(FakeNotifier):
+    """A FakeNotifier whose deliveries take a random number of loop turns, so channels interleave."""
+
+    def __init__(self, seed=0, **kwargs):
+        super().__init__(**kwargs)
+        self.random = random.Random(seed)
+        self.active = set()
+        self.most_active = 0
+
+    async def deliver(self, channel_id, content):
+        self.active.add(channel_id)
+        self.most_active = max(self.most_active, len(self.active))
+        for _ in range(self.random.randint(0, 3)):
+            await asyncio.sleep(0)
+        await super().deliver(channel_id, content)
+        self.active.discard(channel_id)
+
+
+class StubResponse:
+    def __init__(self, status, body=None, headers=None):
+        self.status = status
+        self.body = body or {}
+        self.headers = headers or {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def json(self):
+        return self.body
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise RuntimeError(f"HTTP {self.status}")
+
+
+class StubSession:
+    """Hands out the queued responses in order and keeps every (url, json) posted."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.posts = []
+        self.closed = False
+
+    def post(self, url, json=None):
+        self.posts.append((url, json))
+        return self.responses.pop(0)
+
+    async def close(self):
+        self.closed = True
+
+
+class StubWebhookNotifier(WebhookNotifier):
+    def __init__(self, session, **kwargs):
+        super().__init__({1: "https://discord.test/hook/1"}, **kwargs)
+        self.stub_session = session
+
+    async def open(self):
+        self.session = self.stub_session
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Records every asyncio.sleep the notifier asks for instead of waiting it out."""
+    waited = []
+    real_sleep = asyncio.sleep
+
+    async def sleep(seconds):
+        waited.append(seconds)
+        await real_sleep(0)
+    monkeypatch.setattr(asyncio, "sleep", sleep)
+    return waited
+
+
+def test_flush_keeps_per_channel_order():
+    notifier = SlowFakeNotifier(max_concurrent=3)
+    channels = range(6)
+    for i in range(10):
+        for channel_id in channels:
+            notifier.queue(channel_id, f"{channel_id}:{i}")
+    notifier.send()
+
+    assert len(notifier.sent) == 60
+    for channel_id in channels:
+        assert [content for cid, content in notifier.sent if cid == channel_id] == [f"{channel_id}:{i}" for i in range(10)]
+    # Channels really were sent to concurrently, and never more than max_concurrent at once
+    assert 1 < notifier.most_active <= 3
+    assert notifier.pending == {}
+
+def test_queue_lines_chunks_in_order():
+    notifier = FakeNotifier()
+    lines = [f"line {i} " + "x" * 90 for i in range(60)]
+    notifier.queue_lines(7, lines)
+    notifier.send()
+
+    assert all(len(content) <= MESSAGE_LIMIT for _, content in notifier.sent)
+    assert "".join(content for _, content in notifier.sent) == "".join(line + "\n" for line in lines)
+
+def test_flush_without_messages_sends_nothing():
+    notifier = FakeNotifier()
+    notifier.send()
+    assert notifier.sent == []
+
+
+def test_webhook_waits_out_429(sleeps):
+    session = StubSession(
+        StubResponse(429, {"retry_after": 2.5}),
+        StubResponse(204),
+    )
+    notifier = StubWebhookNotifier(session)
+    notifier.queue(1, "hello")
+    notifier.send()
+
+    assert session.posts == [("https://discord.test/hook/1", {"content": "hello"})] * 2
+    assert sleeps == [2.5]
+    assert session.closed
+
+def test_webhook_waits_for_empty_bucket(sleeps):
+    session = StubSession(
+        StubResponse(204, headers={"X-RateLimit-Remaining": "0", "X-RateLimit-Reset-After": "1.5"}),
+        StubResponse(204, headers={"X-RateLimit-Remaining": "4"}),
+    )
+    notifier = StubWebhookNotifier(session)
+    notifier.queue(1, "first")
+    notifier.queue(1, "second")
+    notifier.send()
+
+    assert [body["content"] for _, body in session.posts] == ["first", "second"]
+    assert sleeps == [1.5]
+
+def test_webhook_gives_up_after_max_retries(sleeps):
+    session = StubSession(*(StubResponse(429, {"retry_after": 1}) for _ in range(3)))
+    notifier = StubWebhookNotifier(session, max_retries=3)
+    notifier.queue(1, "hello")
+    with pytest.raises(RuntimeError):
+        notifier.send()
+    assert sleeps == [1, 1, 1]
+    assert session.closed
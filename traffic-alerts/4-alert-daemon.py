@@ -0,0 +1,129 @@
+import os
+import asyncio
+import discord
+from datetime import datetime, time, timedelta
+from event_store import load_index
+from subscriptions import build_chunks
+from rollups import load_rollups
+from data_sync import sync_calendars
+from validate import validate_folder, errors, format_issue
+import instrument
+
+
+# Long-running replacement for cron-launching the daily and weekly scripts. The event
+# index and a single Discord connection stay warm, and both jobs are scheduled here.
+
+# Folder containing the CSV files from the GitHub repo
+CSV_FOLDER = "./calendars-git"  # Path to the cloned/downloaded repo
+
+# Set STADIUM_EVENTS_REPO to a local repo path to run offline.
+REPO_URL = os.environ.get("STADIUM_EVENTS_REPO", "https://github.com/emilyboda/PhiladelphiaStadiumEvents.git")
+
+# Your Discord credentials
+DISCORD_TOKEN = 'XXXXXXXXXXXXXXXXXXX'
+
+CHANNEL_ID_debugging = XXXXXXXXXXXX  # Channel that gets "no events today" so you still know it's working
+
+# Channels to post to and what each one gets. Besides channel_id and kind ("daily" or
+# "weekly"), a subscription can set venues, early_hour, large_attendance,
+# combined_attendance and lookahead_days (see subscriptions.py). Subscriptions that
+# share the same settings are only evaluated once.
+SUBSCRIPTIONS = [
+    {"channel_id": XXXXXXXXXXXX, "kind": "daily"},
+    {"channel_id": XXXXXXXXXXXX, "kind": "weekly"},
+    #{"channel_id": XXXXXXXXXXXX, "kind": "weekly", "venues": ["LFF"], "lookahead_days": 10},
+]
+
+# When each job runs, in local time. The weekly job runs on WEEKLY_WEEKDAY (Monday is 0).
+DAILY_AT = time(7, 0)
+WEEKLY_AT = time(18, 0)
+WEEKLY_WEEKDAY = 6
+
+
+def next_run(now, at, weekday=None):
+    run = datetime.combine(now.date(), at)
+    if weekday is not None:
+        run += timedelta(days=(weekday - run.weekday()) % 7)
+    if run <= now:
+        run += timedelta(days=1 if weekday is None else 7)
+    return run
+
+
+class AlertDaemon(discord.Client):
+    def __init__(self):
+        super().__init__(intents=discord.Intents.default())
+        self.index = None
+        self.rollups = None
+        # The scheduled jobs, kept here so they can't be garbage collected while they wait
+        self.jobs = []
+
+    async def setup_hook(self):
+        await self.refresh_index()
+        for job, at, weekday in (("daily", DAILY_AT, None), ("weekly", WEEKLY_AT, WEEKLY_WEEKDAY)):
+            task = asyncio.create_task(self.run_every(job, at, weekday), name=f"{job} alerts")
+            task.add_done_callback(self.job_done)
+            self.jobs.append(task)
+
+    def job_done(self, task):
+        # run_every only returns once the client closes, anything else means the job died
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error is not None:
+            print(f"{task.get_name()} stopped: {error!r}")
+
+    async def refresh_index(self):
+        # git and CSV work is blocking, keep it off the event loop
+        with instrument.span("sync_calendars"):
+            changed = await asyncio.to_thread(sync_calendars, REPO_URL, CSV_FOLDER)
+        if changed or self.index is None:
+            with instrument.span("validate"):
+                problems = errors(await asyncio.to_thread(validate_folder, CSV_FOLDER))
+            for issue in problems:
+                print(format_issue(issue))
+            with instrument.span("load_index"):
+                self.index = await asyncio.to_thread(load_index, CSV_FOLDER)
+                self.rollups = await asyncio.to_thread(load_rollups, self.index)
+            print(f"Loaded {len(self.index)} events")
+
+    async def get_channel_or_fetch(self, channel_id):
+        return self.get_channel(channel_id) or await self.fetch_channel(channel_id)
+
+    async def send_chunks(self, channel_id, chunks):
+        channel = await self.get_channel_or_fetch(channel_id)
+        for part in chunks:
+            await channel.send(part)
+
+    async def post(self, job, messages):
+        if job == "daily" and not any(messages.values()):
+            channel = await self.get_channel_or_fetch(CHANNEL_ID_debugging)
+            await channel.send("daily alert daemon ran, no events today")
+            return
+
+        # Channels are sent to concurrently, discord.py waits out any rate limits
+        await asyncio.gather(*(
+            self.send_chunks(channel_id, chunks) for channel_id, chunks in messages.items() if chunks
+        ))
+
+    async def run_every(self, job, at, weekday):
+        await self.wait_until_ready()
+        while not self.is_closed():
+            run_at = next_run(datetime.now(), at, weekday)
+            print(f"Next {job} alert at {run_at}")
+            await asyncio.sleep((run_at - datetime.now()).total_seconds())
+            try:
+                await self.refresh_index()
+                # Summaries are rendered and chunked off the event loop, post only sends them
+                messages = await asyncio.to_thread(build_chunks, SUBSCRIPTIONS, job, self.index, datetime.now(), self.rollups)
+                print(f"Built {job} alerts for {len(messages)} channels")
+                with instrument.span("post", job=job):
+                    await self.post(job, messages)
+            except Exception as e:
+                # Keep the daemon alive, the next run gets another chance
+                print(f"Error running {job} alert: {e}")
+            # The daemon doesn't exit, so write the metrics out after every run
+            instrument.flush()
+
+
+if DISCORD_TOKEN != "YOUR_DISCORD_BOT_TOKEN":
+    AlertDaemon().run(DISCORD_TOKEN)
@@ -0,0 +1,45 @@
+import os
+from event_store import cache_path
+from calendar_diff import SNAPSHOT_FILE, SnapshotStore, folder_changes, format_changes
+from notifier import DiscordNotifier
+from data_sync import sync_calendars
+
+
+# Lets a channel know when an already published month's calendar changes, listing only
+# the events that were added, removed or rescheduled. Run it after (or as often as)
+# the daily script, e.g. from cron.
+
+# Folder containing the CSV files from the GitHub repo
+CSV_FOLDER = "./calendars-git"  # Path to the cloned/downloaded repo
+
+# Set STADIUM_EVENTS_REPO to a local repo path to run offline.
+REPO_URL = os.environ.get("STADIUM_EVENTS_REPO", "https://github.com/emilyboda/PhiladelphiaStadiumEvents.git")
+
+# Your Discord credentials
+DISCORD_TOKEN = 'XXXXXXXXXXXXXXXXXXX'
+
+CHANNEL_ID = XXXXXXXXXXXX # The discord channel ID that gets the calendar changes
+
+
+# Month files are compared with their last snapshot by mtime and size, so changes
+# pulled in by another script's sync are still picked up here
+sync_calendars(REPO_URL, CSV_FOLDER)
+store = SnapshotStore(cache_path(CSV_FOLDER, SNAPSHOT_FILE))
+changes = folder_changes(CSV_FOLDER, store)
+
+notifier = DiscordNotifier(DISCORD_TOKEN)
+for year_month, month_changes in changes.items():
+    if month_changes is None:
+        # First time we've seen this month, there's nothing to compare it with
+        print(f"New month {year_month[0]}-{year_month[1]:02d}, snapshot saved")
+        continue
+    lines = format_changes(year_month, month_changes)
+    for line in lines:
+        print(line)
+    notifier.queue_lines(CHANNEL_ID, lines)
+
+if DISCORD_TOKEN != "YOUR_DISCORD_BOT_TOKEN":
+    notifier.send()
+
+# Only remember the new versions once the alerts for them have gone out
+store.save()
@@ -0,0 +1,40 @@
+import os
+import asyncio
+from event_store import load_index
+from rollups import load_rollups
+from data_sync import sync_calendars
+from event_api import EventApi, serve
+
+
+# Serves the event data as JSON for other local tools, e.g.
+#   curl 'http://127.0.0.1:8080/events?from=2026-05-01&to=2026-05-07&venue=CBP'
+#   curl 'http://127.0.0.1:8080/disruptions?date=2026-05-08'
+
+# Folder containing the CSV files from the GitHub repo
+CSV_FOLDER = "./calendars-git"  # Path to the cloned/downloaded repo
+
+# Set STADIUM_EVENTS_REPO to a local repo path to run offline.
+REPO_URL = os.environ.get("STADIUM_EVENTS_REPO", "https://github.com/emilyboda/PhiladelphiaStadiumEvents.git")
+
+# Where to listen. Keep it on localhost unless you put something in front of it.
+HOST = "127.0.0.1"
+PORT = 8080
+
+# How often to check the repo for new calendars, in seconds
+RELOAD_EVERY = 3600
+
+
+def reload():
+    # Only rebuild when the sync actually brought in new month files
+    if not sync_calendars(REPO_URL, CSV_FOLDER):
+        return None
+    index = load_index(CSV_FOLDER)
+    return index, load_rollups(index)
+
+
+sync_calendars(REPO_URL, CSV_FOLDER)
+index = load_index(CSV_FOLDER)
+api = EventApi(index, load_rollups(index))
+print(f"Loaded {len(index)} events")
+
+asyncio.run(serve(api, HOST, PORT, reload, RELOAD_EVERY))
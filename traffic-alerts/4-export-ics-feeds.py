@@ -0,0 +1,29 @@
+import os
+from event_store import load_index
+from data_sync import sync_calendars
+from ics_feed import export_feeds
+
+
+# Publishes the calendars as .ics feeds people can subscribe to: stadium-events.ics
+# with everything, plus stadium-events-<venue>.ics for each venue. Only feeds whose
+# events changed get rewritten, so it's cheap to run after every sync.
+
+# Folder containing the CSV files from the GitHub repo
+CSV_FOLDER = "./calendars-git"  # Path to the cloned/downloaded repo
+
+# Set STADIUM_EVENTS_REPO to a local repo path to run offline.
+REPO_URL = os.environ.get("STADIUM_EVENTS_REPO", "https://github.com/emilyboda/PhiladelphiaStadiumEvents.git")
+
+# Where the feeds are written, e.g. a folder your web server publishes
+FEED_FOLDER = "./feeds"
+
+
+sync_calendars(REPO_URL, CSV_FOLDER)
+index = load_index(CSV_FOLDER)
+written = export_feeds(index, FEED_FOLDER)
+
+if written:
+    for path in written:
+        print(f"Wrote {path}")
+else:
+    print("Feeds are up to date")
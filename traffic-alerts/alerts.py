@@ -0,0 +1,135 @@
+import calendar
+from datetime import date, datetime, timedelta
+from collections import defaultdict, namedtuple
+from event_store import event_time, month_span
+from normalize import venue_name
+from rollups import outlook, EARLY_EVENT_HOUR, LARGE_EVENT_ATTENDANCE
+from render import EventLine, DayBlock, Summary, render_lines
+
+
+# What a summary covers and when it warns. venues=None means every venue, and
+# lookahead_days is how far past today the weekly summary reaches.
+AlertFilter = namedtuple("AlertFilter", ["venues", "early_hour", "large_attendance", "combined_attendance", "lookahead_days"])
+DEFAULT_FILTER = AlertFilter(None, EARLY_EVENT_HOUR, LARGE_EVENT_ATTENDANCE, LARGE_EVENT_ATTENDANCE, 5)
+
+
+def collect_events(index, start_date, end_date, venues=None):
+    events_by_date = defaultdict(list)
+    # Venue display names are looked up once per venue, not once per event
+    locations = {code: venue_name(code) for code in index.venue_codes}
+    for ev in index.between(start_date, end_date):
+        if venues is not None and ev.venue not in venues:
+            continue
+        events_by_date[ev.date].append({
+            "time_str": ev.time_str,
+            "time_dt": event_time(ev),
+            "event": ev.name,
+            "location": locations[ev.venue],
+            "attendance": ev.attendance
+        })
+    return events_by_date
+
+def uses_default_thresholds(alert_filter):
+    # Rollups are materialized for every venue with the default thresholds only
+    return alert_filter[:4] == DEFAULT_FILTER[:4]
+
+def nearby_combined_days(events_by_date, threshold):
+    """
+    Days whose events add up to more than threshold with at least two of them starting
+    within two hours of each other. The rough check from before overlap.py, used when
+    numpy isn't installed.
+    """
+    combined = set()
+    for event_date, day_events in events_by_date.items():
+        if len(day_events) < 2 or sum(ev["attendance"] for ev in day_events) <= threshold:
+            continue
+        starts = sorted(ev["time_dt"] for ev in day_events if ev["time_dt"])
+        if any(later - earlier <= timedelta(hours=2) for earlier, later in zip(starts, starts[1:])):
+            combined.add(event_date)
+    return combined
+
+def event_lines(day_events, alert_filter):
+    # The day's events with their early/large warnings decided for this filter
+    return tuple(EventLine(
+        ev["time_str"],
+        ev["event"],
+        ev["location"],
+        bool(ev["time_dt"] and ev["time_dt"].hour < alert_filter.early_hour),
+        ev["attendance"] > alert_filter.large_attendance,
+    ) for ev in day_events)
+
+def daily_digest(index, today, rollups=None, alert_filter=DEFAULT_FILTER):
+    """
+    The daily Summary: today's early or large events (by default before 6pm or over
+    50,000), with no blocks when there's nothing disruptive today. With rollups from
+    rollups.load_rollups, a quiet day is answered without looking at any events.
+    """
+    title = "Reminder! There are potentially disruptive events today."
+    if rollups is not None and uses_default_thresholds(alert_filter):
+        day = rollups.get(today.date() if isinstance(today, datetime) else today)
+        if not day or not (day.early or day.large):
+            return Summary("daily", title, (), None, ())
+
+    events_by_date = collect_events(index, today, today, alert_filter.venues)
+    blocks = []
+    for event_date in sorted(events_by_date.keys()):
+        # Only early or large events make the daily summary
+        events = tuple(ev for ev in event_lines(events_by_date[event_date], alert_filter) if ev.early or ev.large)
+        if events:
+            blocks.append(DayBlock("daily", event_date, events, False))
+    return Summary("daily", title, tuple(blocks), None, ())
+
+def weekly_digest(index, today, rollups=None, alert_filter=DEFAULT_FILTER):
+    """
+    The weekly Summary covering tomorrow through five days from now (or the filter's
+    lookahead_days). The combined-events flags come from rollups when they're passed
+    in and apply to the filter.
+    """
+    start_date = today + timedelta(days=1)
+    end_date = today + timedelta(days=alert_filter.lookahead_days)
+
+    missing_months = [ym for ym in month_span(start_date, end_date) if not index.has_month(*ym)]
+    events_by_date = collect_events(index, start_date, end_date, alert_filter.venues)
+    # Days where overlapping event windows add up to a large crowd
+    if rollups is not None and uses_default_thresholds(alert_filter):
+        combined_days = {day.date for day in outlook(rollups, start_date, end_date) if day.combined}
+    else:
+        try:
+            from overlap import combined_event_days  # pulls in numpy, skipped when rollups cover it
+        except ImportError:
+            combined_days = nearby_combined_days(events_by_date, alert_filter.combined_attendance)
+        else:
+            combined_days = combined_event_days(index, start_date, end_date, alert_filter.combined_attendance, alert_filter.venues)
+
+    blocks = []
+    for event_date in sorted(events_by_date.keys()):
+        events = event_lines(events_by_date[event_date], alert_filter)
+        blocks.append(DayBlock("weekly", event_date, events, len(events) > 1 and event_date in combined_days))
+
+    title = f"Welcome to your weekly Navy Yard traffic disruptions summary for {start_date.strftime('%-m/%-d')}-{end_date.strftime('%-m/%-d')}"
+    if 3 <= today.month <= 8:
+        quiet_message = "There are no disruptive events at the stadiums this week. Go Phils!"
+    else:
+        quiet_message = "There are no disruptive events at the stadiums this week. Go Birds!"
+
+    # Add warning for missing months
+    notes = []
+    if missing_months:
+        # The earliest and latest date in the summary range that is missing
+        first_missing, last_missing = missing_months[0], missing_months[-1]
+        min_date = max(start_date.date(), date(*first_missing, 1))
+        max_date = min(end_date.date(), date(*last_missing, calendar.monthrange(*last_missing)[1]))
+        notes.append(f"Warning: events for dates {min_date.strftime('%-m/%-d')}-{max_date.strftime('%-m/%-d')} have not yet been uploaded.")
+
+    return Summary("weekly", title, tuple(blocks), quiet_message, tuple(notes))
+
+def daily_summary(index, today, rollups=None, alert_filter=DEFAULT_FILTER):
+    """
+    Markdown lines for today's early or large events. Returns an empty list when
+    there's nothing disruptive today.
+    """
+    return list(render_lines(daily_digest(index, today, rollups, alert_filter)))
+
+def weekly_summary(index, today, rollups=None, alert_filter=DEFAULT_FILTER):
+    """Markdown lines for the weekly summary, see weekly_digest."""
+    return list(render_lines(weekly_digest(index, today, rollups, alert_filter)))
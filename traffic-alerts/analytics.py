@@ -0,0 +1,215 @@
+import calendar
+import numpy as np
+from collections import namedtuple
+from datetime import date
+from event_store import NO_TIME, cache_path, read_cache, write_cache
+from overlap import column, daily_peaks, hourly_load
+from rollups import LARGE_EVENT_ATTENDANCE
+
+
+# Statistics over every month in the index, for questions the forward-looking alerts
+# can't answer, like "how bad is a Saturday in September usually". Everything is
+# aggregated with numpy in a few passes over the columns, and the result is saved to a
+# model file keyed on the month files' signatures, so a forecast is just a lookup.
+
+# Saved model, kept in the CSV folder
+MODEL_FILE = ".analytics-model.pickle"
+MODEL_VERSION = 1
+
+# A weekday-in-month cell needs this many observed days before it's trusted over the
+# plain weekday numbers
+MIN_SEASON_DAYS = 4
+
+# Total daily attendance a forecast calls light, moderate, heavy and severe
+RATINGS = [(0, "quiet"), (1, "light"), (20000, "moderate"), (LARGE_EVENT_ATTENDANCE, "heavy"), (80000, "severe")]
+
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+Forecast = namedtuple("Forecast", [
+    "date", "scheduled", "event_chance", "multi_event_chance", "combined_chance",
+    "typical_attendance", "high_attendance", "busiest_hours", "rating",
+])
+
+
+def observed_days(index):
+    """Ordinals of every day in the months the index has, and the month of each."""
+    days, months = [], []
+    for year, month in sorted(index.months):
+        first = date(year, month, 1).toordinal()
+        n = calendar.monthrange(year, month)[1]
+        days.append(np.arange(first, first + n, dtype=np.int64))
+        months.append(np.full(n, month - 1, dtype=np.int64))
+    if not days:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    return np.concatenate(days), np.concatenate(months)
+
+def percentiles(values, groups, n_groups, qs=(50, 90, 100)):
+    """Percentiles of values within each group id, shape (n_groups, len(qs)). Empty groups are 0."""
+    out = np.zeros((n_groups, len(qs)))
+    if len(values) == 0:
+        return out
+    # Sort once by group then value, each group is then a contiguous run
+    order = np.lexsort((values, groups))
+    values, groups = values[order], groups[order]
+    bounds = np.searchsorted(groups, np.arange(n_groups + 1))
+    for g in np.flatnonzero(np.diff(bounds)):
+        out[g] = np.percentile(values[bounds[g]:bounds[g + 1]], qs)
+    return out
+
+def build_model(index):
+    """
+    Aggregates the whole index into a dict of arrays:
+      per weekday (7) and weekday x month (7 x 12): days observed, days with events,
+        days with 2+ events, days with a large combined crowd, total attendance
+      per weekday: daily attendance percentiles (p50, p90, max) over event days, and
+        the mean and p90 sports complex load for each hour of the day
+      per venue x weekday and venue x hour: event count and total attendance, plus
+        attendance percentiles per venue x weekday
+    """
+    all_days, all_months = observed_days(index)
+    model = {"version": MODEL_VERSION, "venue_codes": list(index.venue_codes), "days_observed": len(all_days)}
+    n_venues = len(index.venue_codes)
+    if len(all_days) == 0:
+        return model
+    first, last = int(all_days[0]), int(all_days[-1])
+    span_days = last - first + 1
+
+    days = column(index.days).astype(np.int64)
+    minutes = column(index.minutes).astype(np.int64)
+    venues = column(index.venues).astype(np.int64)
+    attendance = column(index.attendance).astype(np.int64)
+    inside = (days >= first) & (days <= last)
+    days, minutes, venues, attendance = days[inside], minutes[inside], venues[inside], attendance[inside]
+
+    # Per calendar day, over the whole span, then picked out for the observed days
+    offset = all_days - first
+    events = np.bincount(days - first, minlength=span_days)[offset]
+    total = np.bincount(days - first, weights=attendance, minlength=span_days).astype(np.int64)[offset]
+    peaks = np.zeros(span_days, dtype=np.int64)
+    for day, peak in daily_peaks(index, date.fromordinal(first), date.fromordinal(last)).items():
+        peaks[day.toordinal() - first] = peak
+    combined = peaks[offset] > LARGE_EVENT_ATTENDANCE
+    weekday = (all_days - 1) % 7
+    cell = weekday * 12 + all_months
+
+    for name, groups, size in (("weekday", weekday, 7), ("weekday_month", cell, 84)):
+        stats = np.stack([
+            np.bincount(groups, minlength=size),
+            np.bincount(groups, weights=events > 0, minlength=size),
+            np.bincount(groups, weights=events > 1, minlength=size),
+            np.bincount(groups, weights=combined, minlength=size),
+            np.bincount(groups, weights=total, minlength=size),
+        ], axis=1).astype(np.int64)
+        model[name] = stats if size == 7 else stats.reshape(7, 12, 5)
+
+    busy = events > 0
+    model["weekday_attendance"] = percentiles(total[busy], weekday[busy], 7)
+
+    load = hourly_load(index, date.fromordinal(first), date.fromordinal(last))[offset]
+    model["weekday_hourly_mean"] = np.stack([load[weekday == w].mean(axis=0) if (weekday == w).any() else np.zeros(24)
+                                             for w in range(7)])
+    model["weekday_hourly_p90"] = percentiles(
+        load.ravel(), np.repeat(weekday * 24, 24) + np.tile(np.arange(24), len(weekday)), 7 * 24, (90,)
+    ).reshape(7, 24)
+
+    event_weekday = (days - 1) % 7
+    venue_weekday = venues * 7 + event_weekday
+    model["venue_weekday"] = np.stack([
+        np.bincount(venue_weekday, minlength=n_venues * 7),
+        np.bincount(venue_weekday, weights=attendance, minlength=n_venues * 7),
+    ], axis=1).astype(np.int64).reshape(n_venues, 7, 2)
+    model["venue_weekday_attendance"] = percentiles(attendance, venue_weekday, n_venues * 7).reshape(n_venues, 7, 3)
+
+    timed = minutes != NO_TIME
+    venue_hour = venues[timed] * 24 + minutes[timed] // 60
+    model["venue_hour"] = np.stack([
+        np.bincount(venue_hour, minlength=n_venues * 24),
+        np.bincount(venue_hour, weights=attendance[timed], minlength=n_venues * 24),
+    ], axis=1).astype(np.int64).reshape(n_venues, 24, 2)
+    return model
+
+def load_model(index, model_file=MODEL_FILE):
+    """
+    The model for index, from model_file when it was built from the same month files,
+    otherwise rebuilt and saved there. Pass model_file=None to always rebuild.
+    """
+    model_file = cache_path(index.folder, model_file)
+    cache = read_cache(model_file, MODEL_VERSION)
+    if cache and index.signatures and cache.get("signatures") == index.signatures:
+        return cache["model"]
+
+    model = build_model(index)
+    if model_file and index.signatures:
+        write_cache(model_file, MODEL_VERSION, {"signatures": index.signatures, "model": model})
+    return model
+
+def rating_for(attendance):
+    label = RATINGS[0][1]
+    for threshold, name in RATINGS:
+        if attendance >= threshold:
+            label = name
+    return label
+
+def forecast(model, day, index=None):
+    """
+    How busy day is likely to be. Where the index already has day's month the scheduled
+    events decide it, otherwise it's estimated from the same weekday in the same month
+    of past years (or from the weekday alone when there isn't enough of that).
+    """
+    weekday = day.weekday()
+    if model.get("days_observed", 0) == 0:
+        return Forecast(day, None, None, None, None, 0, 0, [], "unknown")
+
+    stats = model["weekday_month"][weekday, day.month - 1]
+    if stats[0] < MIN_SEASON_DAYS:
+        stats = model["weekday"][weekday]
+    observed, event_days, multi_days, combined_days, total = (int(n) for n in stats)
+    event_chance = event_days / observed if observed else 0.0
+    multi_chance = multi_days / observed if observed else 0.0
+    combined_chance = combined_days / observed if observed else 0.0
+    typical = total / event_days if event_days else 0.0
+    high = float(model["weekday_attendance"][weekday][1])
+
+    hourly = model["weekday_hourly_mean"][weekday]
+    busiest = [int(h) for h in np.argsort(hourly)[::-1][:3] if hourly[h] > 0]
+
+    scheduled = None
+    if index is not None and index.has_month(day.year, day.month):
+        scheduled = index.on(day)
+        attendance = sum(ev.attendance for ev in scheduled)
+        peak = daily_peaks(index, day, day).get(day, 0)
+        event_chance = 1.0 if scheduled else 0.0
+        multi_chance = 1.0 if len(scheduled) > 1 else 0.0
+        combined_chance = 1.0 if peak > LARGE_EVENT_ATTENDANCE else 0.0
+        # The biggest crowd there at once, one event's or several overlapping
+        crowd = max([peak] + [ev.attendance for ev in scheduled])
+        return Forecast(day, scheduled, event_chance, multi_chance, combined_chance, attendance, crowd, busiest,
+                        rating_for(attendance))
+
+    # Expected crowd over all days like this one, events or not
+    expected = typical * event_chance
+    rating = rating_for(expected if combined_chance < 0.5 else max(expected, LARGE_EVENT_ATTENDANCE + 1))
+    return Forecast(day, None, event_chance, multi_chance, combined_chance, typical, high, busiest, rating)
+
+def format_forecast(result, location_map=None):
+    location_map = location_map or {}
+    weekday = WEEKDAYS[result.date.weekday()]
+    lines = [f"## Traffic outlook for {weekday}, {result.date.strftime('%-m/%-d')}: {result.rating}", ""]
+    if result.scheduled is not None:
+        if not result.scheduled:
+            lines.append("* No events are scheduled.")
+        for ev in result.scheduled:
+            lines.append(f"* {ev.time_str}: {ev.name} at {location_map.get(ev.venue, ev.venue)} ({ev.attendance:,})")
+        if result.combined_chance:
+            lines.append("* Overlapping events add up to a large combined crowd.")
+    elif result.event_chance is not None:
+        lines.append(f"* The schedule isn't out yet. Past {weekday}s like this one had events "
+                     f"{result.event_chance:.0%} of the time, and more than one {result.multi_event_chance:.0%} of the time.")
+        if result.event_chance:
+            lines.append(f"* A typical event day drew {result.typical_attendance:,.0f} people, a busy one {result.high_attendance:,.0f}.")
+        if result.combined_chance:
+            lines.append(f"* {result.combined_chance:.0%} had a large combined crowd.")
+    if result.busiest_hours:
+        hours = ", ".join(f"{h % 12 or 12}{'am' if h < 12 else 'pm'}" for h in result.busiest_hours)
+        lines.append(f"* {weekday}s are usually busiest around {hours}.")
+    return lines
@@ -0,0 +1,141 @@
+import re
+from collections import defaultdict, namedtuple
+from datetime import date
+from event_store import find_month_files, file_signature, read_cache, read_month_file, write_cache
+from normalize import LOCATION_MAP
+
+
+# Compares a month's events with the last version of that month we saw and reports what
+# was added, removed or rescheduled. The previous version of every month is kept,
+# already keyed, in a snapshot file, so a new calendar version only alerts its deltas.
+
+# Snapshots of every month last seen, kept in the CSV folder
+SNAPSHOT_FILE = ".calendar-snapshots.pickle"
+SNAPSHOT_VERSION = 1
+
+# kind is "added", "removed" or "rescheduled". old and new are month file rows
+# (date, time_str, minute, venue, name, attendance), either may be None.
+Change = namedtuple("Change", ["kind", "old", "new"])
+
+NAME_NOISE = re.compile(r"[^a-z0-9]+")
+
+
+def event_key(row):
+    # Venue plus a loose version of the name, so "Phillies vs. Mets" and "PHILLIES vs Mets"
+    # are the same event. The date isn't part of it, that's what a reschedule changes.
+    return row[3], NAME_NOISE.sub(" ", row[4].lower()).strip()
+
+def key_rows(rows):
+    """{event key: rows with that key in date order}, the form snapshots are kept in."""
+    keyed = defaultdict(list)
+    for row in sorted(rows, key=lambda r: (r[0], r[2])):
+        keyed[event_key(row)].append(row)
+    return dict(keyed)
+
+def unmatched(rows, others):
+    # rows with no counterpart at the same date and time in others
+    slots = defaultdict(int)
+    for row in others:
+        slots[row[0], row[2]] += 1
+    left = []
+    for row in rows:
+        if slots[row[0], row[2]]:
+            slots[row[0], row[2]] -= 1
+        else:
+            left.append(row)
+    return left
+
+def diff_keyed(old, new):
+    """
+    Changes between two keyed snapshots, in date order. Events sharing a key (e.g. the
+    games of a series) that kept their date and time are unchanged. The ones left over
+    are paired up in date order as reschedules, anything unpaired was added or removed.
+    Every event is looked at a constant number of times.
+    """
+    changes = []
+    for key in old.keys() | new.keys():
+        before, after = old.get(key, []), new.get(key, [])
+        if before == after:
+            continue
+        moved = unmatched(before, after)
+        arrived = unmatched(after, before)
+
+        for old_row, new_row in zip(moved, arrived):
+            changes.append(Change("rescheduled", old_row, new_row))
+        changes.extend(Change("removed", row, None) for row in moved[len(arrived):])
+        changes.extend(Change("added", None, row) for row in arrived[len(moved):])
+
+    changes.sort(key=lambda c: ((c.new or c.old)[0], (c.new or c.old)[2]))
+    return changes
+
+def diff_rows(old_rows, new_rows):
+    return diff_keyed(key_rows(old_rows), key_rows(new_rows))
+
+
+class SnapshotStore:
+    """
+    The last seen version of each month, stored keyed so diffing a new version only
+    has to key the new rows. Months are tracked by (year, month) so a calendar saved
+    under a new file name (e.g. May2024_v2) still diffs against the previous version.
+    """
+
+    def __init__(self, path=SNAPSHOT_FILE):
+        self.path = path
+        stored = read_cache(path, SNAPSHOT_VERSION)
+        self.months = stored["months"] if stored else {}
+        self.dirty = False
+
+    def signature(self, year_month):
+        return self.months[year_month][0] if year_month in self.months else None
+
+    def update(self, year_month, rows, signature=None):
+        """
+        Stores rows as the current version of the month and returns its changes from
+        the previous version, or None if the month hadn't been seen before.
+        """
+        keyed = key_rows(rows)
+        previous = self.months.get(year_month)
+        self.months[year_month] = (signature, keyed)
+        self.dirty = True
+        if previous is None:
+            return None
+        return diff_keyed(previous[1], keyed)
+
+    def save(self):
+        if self.dirty:
+            write_cache(self.path, SNAPSHOT_VERSION, {"months": self.months})
+            self.dirty = False
+
+def folder_changes(csv_folder, store):
+    """
+    Diffs every month file in csv_folder whose mtime or size changed since its snapshot.
+    Returns {(year, month): changes}, with None for months seen for the first time.
+    """
+    changes = {}
+    for ym, path in sorted(find_month_files(csv_folder).items()):
+        signature = file_signature(path)
+        if store.signature(ym) == signature:
+            continue
+        month_changes = store.update(ym, read_month_file(path, *ym), signature)
+        if month_changes is None or month_changes:
+            changes[ym] = month_changes
+    return changes
+
+def describe(row):
+    day = row[0]
+    return f"{day.strftime('%a')}, {day.strftime('%-m/%-d')} at {row[1]}"
+
+def format_changes(year_month, changes):
+    """Discord lines describing one month's changes."""
+    month_name = date(*year_month, 1).strftime("%B %Y")
+    lines = [f"## The {month_name} calendar changed", ""]
+    for change in changes:
+        row = change.new or change.old
+        event = f"{row[4]} at {LOCATION_MAP.get(row[3], row[3])}"
+        if change.kind == "added":
+            lines.append(f"* **Added, {describe(row)}:** {event}")
+        elif change.kind == "removed":
+            lines.append(f"* **Removed, {describe(row)}:** {event}")
+        else:
+            lines.append(f"* **Rescheduled:** {event} moved from {describe(change.old)} to {describe(change.new)}")
+    return lines
@@ -0,0 +1,88 @@
+import os
+import shutil
+import subprocess
+import time
+from pathlib import Path
+
+
+BRANCH = "main"
+
+# Don't even ask the remote for its head if we checked this recently (seconds)
+MIN_CHECK_INTERVAL = 5 * 60
+
+# Stamp file inside the clone's .git folder, touched every time the remote is checked
+CHECK_STAMP = "stadium-events-last-check"
+
+
+def git(*args, cwd=None):
+    result = subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True, text=True)
+    return result.stdout.strip()
+
+def remote_head(repo_url, branch=BRANCH):
+    # ls-remote only exchanges refs, no objects get transferred
+    out = git("ls-remote", repo_url, f"refs/heads/{branch}")
+    return out.split()[0] if out else None
+
+def local_head(csv_folder):
+    try:
+        return git("rev-parse", "HEAD", cwd=csv_folder)
+    except subprocess.CalledProcessError:
+        return None
+
+def checked_recently(csv_folder, min_interval):
+    stamp = Path(csv_folder) / ".git" / CHECK_STAMP
+    try:
+        return time.time() - stamp.stat().st_mtime < min_interval
+    except OSError:
+        return False
+
+def touch_check_stamp(csv_folder):
+    (Path(csv_folder) / ".git" / CHECK_STAMP).touch()
+
+def sync_calendars(repo_url, csv_folder, branch=BRANCH, min_interval=MIN_CHECK_INTERVAL):
+    """
+    Brings csv_folder up to date with repo_url and returns the names of the month CSVs
+    that changed (every CSV on a fresh clone, an empty list if nothing changed).
+
+    The remote's head commit is compared against the local one with ls-remote first,
+    so an unchanged remote costs one ref lookup and no fetch. If the remote was already
+    checked within min_interval seconds the sync is skipped entirely.
+    """
+    if not os.path.isdir(os.path.join(csv_folder, ".git")):
+        print(f"Cloning {repo_url} into {csv_folder}...")
+        git("clone", "--depth", "1", "--branch", branch, repo_url, csv_folder)
+        touch_check_stamp(csv_folder)
+        return sorted(p.name for p in Path(csv_folder).glob("*.csv"))
+
+    if min_interval and checked_recently(csv_folder, min_interval):
+        print(f"{csv_folder} was checked less than {min_interval}s ago, skipping sync.")
+        return []
+
+    old_head = local_head(csv_folder)
+    new_head = remote_head(repo_url, branch)
+    touch_check_stamp(csv_folder)
+    if new_head is None or new_head == old_head:
+        print(f"{csv_folder} is already up to date.")
+        return []
+
+    print(f"Updating {csv_folder} from {old_head[:7] if old_head else 'nothing'} to {new_head[:7]}...")
+    git("fetch", "--depth", "1", repo_url, branch, cwd=csv_folder)
+    changed = git("diff", "--name-only", old_head or "HEAD", "FETCH_HEAD", "--", "*.csv", cwd=csv_folder)
+    # reset only rewrites the files that differ between the two commits
+    git("reset", "--hard", "FETCH_HEAD", cwd=csv_folder)
+    return [name for name in changed.splitlines() if name]
+
+def make_local_remote(source_folder, remote_dir, branch=BRANCH):
+    """
+    Creates a git repo at remote_dir holding the month CSVs from source_folder, to use
+    as a stand-in for the GitHub remote when running offline. Pass remote_dir as the
+    repo_url to sync_calendars, and commit into it to simulate upstream updates.
+    """
+    os.makedirs(remote_dir, exist_ok=True)
+    git("init", "--quiet", "--initial-branch", branch, cwd=remote_dir)
+    for file in Path(source_folder).glob("*.csv"):
+        shutil.copy2(file, remote_dir)
+    git("add", "--all", cwd=remote_dir)
+    git("-c", "user.name=local", "-c", "user.email=local@localhost",
+        "commit", "--quiet", "--allow-empty", "-m", "Local stand-in remote", cwd=remote_dir)
+    return os.path.abspath(remote_dir)
@@ -0,0 +1,218 @@
+import gzip
+import json
+import asyncio
+import hashlib
+from collections import OrderedDict
+from datetime import date
+from urllib.parse import urlsplit, parse_qs
+from normalize import LOCATION_MAP
+from rollups import load_rollups
+
+
+# Small HTTP/1.1 JSON API over the event index, on plain asyncio streams.
+#
+#   GET /events?from=2026-05-01&to=2026-05-31&venue=CBP
+#   GET /disruptions?date=2026-05-08
+#
+# Responses are cached per endpoint and query (in any parameter order) until the data
+# is reloaded, carry an ETag (so a matching If-None-Match gets a 304), and are gzipped
+# when the client accepts it.
+
+# Bodies smaller than this aren't worth gzipping
+GZIP_MIN_BYTES = 512
+
+# How many rendered responses to keep, least recently used ones are dropped first
+RESPONSE_CACHE_SIZE = 1024
+
+# Longest request head we'll read before giving up on the client
+MAX_HEAD_BYTES = 16 * 1024
+
+REASONS = {200: "OK", 304: "Not Modified", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           500: "Internal Server Error"}
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def parse_date(query, name, default=None):
+    values = query.get(name)
+    if not values:
+        if default is None:
+            raise ApiError(400, f"missing '{name}' parameter")
+        return default
+    try:
+        return date.fromisoformat(values[0])
+    except ValueError:
+        raise ApiError(400, f"'{name}' must be a YYYY-MM-DD date")
+
+def event_json(ev):
+    return {
+        "date": ev.date.isoformat(),
+        "time": ev.time_str,
+        "minute": ev.minute if ev.minute >= 0 else None,
+        "venue": ev.venue,
+        "venue_name": LOCATION_MAP.get(ev.venue, ev.venue),
+        "name": ev.name,
+        "attendance": ev.attendance,
+    }
+
+
+class EventApi:
+    def __init__(self, index, rollups=None):
+        self.load(index, rollups)
+
+    def load(self, index, rollups=None):
+        """Swaps in new data and drops every cached response."""
+        self.index = index
+        self.rollups = rollups if rollups is not None else load_rollups(index, None)
+        self.responses = OrderedDict()
+
+    def events(self, query):
+        start = parse_date(query, "from")
+        end = parse_date(query, "to", start)
+        if end < start:
+            raise ApiError(400, "'to' is before 'from'")
+        venue = query.get("venue", [None])[0]
+        return {
+            "from": start.isoformat(),
+            "to": end.isoformat(),
+            "venue": venue,
+            "events": [event_json(ev) for ev in self.index.between(start, end, venue)],
+        }
+
+    def disruptions(self, query):
+        day = parse_date(query, "date")
+        rollup = self.rollups.get(day)
+        return {
+            "date": day.isoformat(),
+            "events": rollup.events if rollup else 0,
+            "attendance": rollup.attendance if rollup else 0,
+            "early": rollup.early if rollup else False,
+            "large": rollup.large if rollup else False,
+            "combined": rollup.combined if rollup else False,
+            "combined_peak_crowd": rollup.peak if rollup else 0,
+            "hourly_peak_crowd": list(rollup.hourly_peak) if rollup else [0] * 24,
+            "event_list": [event_json(ev) for ev in self.index.on(day)] if rollup else [],
+        }
+
+    ROUTES = {"/events": events, "/disruptions": disruptions}
+
+    def response(self, target):
+        """
+        Returns (status, etag, body, gzipped body) for a GET of target, rendering the
+        JSON only the first time an endpoint is asked for with the same query.
+        """
+        url = urlsplit(target)
+        query = parse_qs(url.query)
+        key = (url.path, tuple(sorted((name, tuple(values)) for name, values in query.items())))
+        if key in self.responses:
+            self.responses.move_to_end(key)
+            return self.responses[key]
+        route = self.ROUTES.get(url.path)
+        try:
+            if route is None:
+                raise ApiError(404, f"no such endpoint {url.path}")
+            status, payload = 200, route(self, query)
+        except ApiError as e:
+            status, payload = e.status, {"error": str(e)}
+        except Exception as e:
+            # Keep serving, the client gets a JSON error like any other
+            print(f"Error answering {target}: {e!r}")
+            status, payload = 500, {"error": "internal error"}
+
+        body = json.dumps(payload, separators=(",", ":")).encode()
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        gzipped = gzip.compress(body) if len(body) >= GZIP_MIN_BYTES else None
+        response = (status, etag, body, gzipped)
+        if status == 200:
+            self.responses[key] = response
+            if len(self.responses) > RESPONSE_CACHE_SIZE:
+                self.responses.popitem(last=False)
+        return response
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+                request_line, *header_lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, target, version = request_line.split(" ")
+                except ValueError:
+                    break
+                headers = {}
+                for line in header_lines:
+                    if ":" in line:
+                        name, value = line.split(":", 1)
+                        headers[name.strip().lower()] = value.strip()
+
+                writer.write(self.respond(method, target, headers))
+                await writer.drain()
+
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+
+    def respond(self, method, target, headers):
+        if method not in ("GET", "HEAD"):
+            status, etag, body, gzipped = 405, None, b'{"error":"only GET and HEAD are supported"}', None
+        else:
+            status, etag, body, gzipped = self.response(target)
+
+        response_headers = {"Content-Type": "application/json", "Vary": "Accept-Encoding"}
+        if etag:
+            response_headers["ETag"] = etag
+            if status == 200 and etag in headers.get("if-none-match", ""):
+                status, body = 304, b""
+        if body and gzipped and "gzip" in headers.get("accept-encoding", ""):
+            body = gzipped
+            response_headers["Content-Encoding"] = "gzip"
+        response_headers["Content-Length"] = str(len(body))
+
+        head = f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+        head += "".join(f"{name}: {value}\r\n" for name, value in response_headers.items())
+        return (head + "\r\n").encode("latin-1") + (b"" if method == "HEAD" else body)
+
+
+def serving_done(task):
+    # serve_forever only returns by being cancelled, anything else means the server died
+    if not task.cancelled() and task.exception() is not None:
+        print(f"Server stopped: {task.exception()!r}")
+
+async def serve(api, host, port, reload=None, reload_every=None):
+    """
+    Serves api until cancelled. If reload is given it's called in a worker thread every
+    reload_every seconds and should return a fresh (index, rollups), or None when the
+    data hasn't changed.
+    """
+    server = await asyncio.start_server(api.handle, host, port, limit=MAX_HEAD_BYTES)
+    print(f"Serving stadium events on http://{host}:{port}")
+    async with server:
+        if reload is None or not reload_every:
+            await server.serve_forever()
+            return
+        # Kept so the task can't be garbage collected, and stopped along with serve
+        serving = asyncio.create_task(server.serve_forever())
+        serving.add_done_callback(serving_done)
+        try:
+            while True:
+                await asyncio.wait({serving}, timeout=reload_every)
+                if serving.done():
+                    return
+                try:
+                    fresh = await asyncio.to_thread(reload)
+                except Exception as e:
+                    print(f"Error reloading events: {e}")
+                    continue
+                if fresh:
+                    api.load(*fresh)
+                    print(f"Reloaded {len(api.index)} events")
+        finally:
+            serving.cancel()
@@ -0,0 +1,289 @@
+import io
+import os
+import csv
+import sys
+import json
+import mmap
+import struct
+from array import array
+from collections import namedtuple
+from datetime import date
+from event_store import EventIndex, find_month_files, file_signature
+from normalize import NO_TIME, CSV_FIELDS, clean_event_name, normalize_time_display, parse_minute
+
+
+# Binary archive of every month CSV in one file, for consumers that would otherwise
+# reparse the text. Rows are stored column by column as fixed-width little-endian
+# blocks (day ordinal, minute of day, venue id, attendance, name id, time id), and all
+# text is interned once in a string table. Opening an archive is an mmap and a header
+# read, and the columns are memoryviews straight onto the mapping.
+#
+# It round-trips to the CSVs byte for byte. Rows that don't fit the typed columns (a
+# missing attendance, or one with stray spaces) keep their raw fields in an overrides
+# table, and a month whose text wouldn't come back identical out of csv.writer keeps
+# its raw text as well.
+
+ARCHIVE_FILE = "events.archive"
+MAGIC = b"SEVA"
+ARCHIVE_VERSION = 1
+
+# Typed row columns: name, array typecode
+COLUMNS = [("days", "i"), ("minutes", "h"), ("venues", "H"), ("attendance", "i"), ("names", "I"), ("times", "I")]
+# Every block in file order, each starting on an 8 byte boundary
+BLOCKS = ["months"] + [name for name, _ in COLUMNS] + ["venue_codes", "overrides", "string_offsets", "string_data"]
+
+# magic, version, month count, venue count, row count, string count, override count,
+# then the offset of every block
+HEADER = struct.Struct(f"<4sHHIIII{len(BLOCKS)}Q")
+# year, month, flags, first row, row count, raw text string id (or NONE), and the
+# (mtime_ns, size) signature of the file the month came from
+MONTH = struct.Struct("<HBBIIIqq")
+
+CRLF = 1          # month flag: lines end in \r\n
+NO_FINAL_EOL = 2  # month flag: the file doesn't end with a line break
+
+NONE = 0xFFFFFFFF
+# Venue id of rows read_month_file would skip, their fields are only in the overrides table
+SKIPPED_VENUE = 0xFFFF
+
+ArchiveMonth = namedtuple("ArchiveMonth", ["flags", "first_row", "row_count", "raw", "signature"])
+
+
+def render_csv(rows, flags):
+    out = io.StringIO()
+    writer = csv.writer(out, lineterminator="\r\n" if flags & CRLF else "\n")
+    writer.writerow(CSV_FIELDS)
+    writer.writerows(rows)
+    text = out.getvalue()
+    if flags & NO_FINAL_EOL:
+        text = text[:-2] if flags & CRLF else text[:-1]
+    return text
+
+def parse_fields(fields, year, month):
+    """(day ordinal, attendance) read the way read_month_file reads them, or None for a row it skips."""
+    if len(fields) < 5:
+        return None
+    try:
+        day, attendance = date(year, month, int(fields[0])).toordinal(), int(fields[4])
+    except ValueError:
+        return None
+    return (day, attendance) if -2 ** 31 <= attendance < 2 ** 31 else None
+
+def renders_exactly(fields, parsed):
+    # Whether the typed columns give back exactly these fields
+    return len(fields) == 5 and str(date.fromordinal(parsed[0]).day) == fields[0] and str(parsed[1]) == fields[4]
+
+def little_endian(block):
+    if sys.byteorder != "little":
+        block = array(block.typecode, block)
+        block.byteswap()
+    return memoryview(block).cast("B")
+
+
+def write_archive(csv_folder, archive_path=None):
+    """
+    Packs every month CSV in csv_folder into archive_path (events.archive in the same
+    folder by default). Only files with the usual Date,Time,Location,Event Name,Attendance
+    header are supported. Returns the number of rows written.
+    """
+    archive_path = archive_path or os.path.join(csv_folder, ARCHIVE_FILE)
+    string_ids = {}
+    def intern(text):
+        return string_ids.setdefault(text, len(string_ids))
+
+    columns = {name: array(typecode) for name, typecode in COLUMNS}
+    venue_ids = {}
+    overrides = array("I")
+    months = []
+
+    for (year, month), path in sorted(find_month_files(csv_folder).items()):
+        with open(path, "rb") as f:
+            raw = f.read().decode("utf-8")
+        records = list(csv.reader(io.StringIO(raw, newline="")))
+        if not records or records[0] != CSV_FIELDS:
+            raise ValueError(f"{path} doesn't start with the {','.join(CSV_FIELDS)} header")
+        rows = records[1:]
+        flags = (CRLF if "\r\n" in raw else 0) | (0 if raw.endswith("\n") else NO_FINAL_EOL)
+
+        first_row = len(columns["days"])
+        for fields in rows:
+            parsed = parse_fields(fields, year, month)
+            if parsed is None or not renders_exactly(fields, parsed):
+                overrides.extend((len(columns["days"]), intern(json.dumps(fields))))
+            if parsed is None:
+                columns["days"].append(date(year, month, 1).toordinal())
+                columns["minutes"].append(NO_TIME)
+                columns["venues"].append(SKIPPED_VENUE)
+                columns["attendance"].append(0)
+                columns["names"].append(NONE)
+                columns["times"].append(NONE)
+                continue
+            minute = parse_minute(normalize_time_display(fields[1]))
+            columns["days"].append(parsed[0])
+            columns["minutes"].append(NO_TIME if minute is None else minute)
+            columns["venues"].append(venue_ids.setdefault(fields[2], len(venue_ids)))
+            columns["attendance"].append(parsed[1])
+            columns["names"].append(intern(fields[3]))
+            columns["times"].append(intern(fields[1]))
+
+        # Between the typed columns and the overrides every row's fields come back exactly
+        raw_id = NONE if render_csv(rows, flags) == raw else intern(raw)
+        months.append(MONTH.pack(year, month, flags, first_row, len(rows), raw_id, *file_signature(path)))
+
+    venue_codes = array("I", (intern(code) for code in venue_ids))
+    encoded = [text.encode("utf-8") for text in string_ids]
+    string_offsets = array("I", [0])
+    for data in encoded:
+        string_offsets.append(string_offsets[-1] + len(data))
+
+    blocks = [memoryview(b"".join(months))]
+    blocks += [little_endian(columns[name]) for name, _ in COLUMNS]
+    blocks += [little_endian(venue_codes), little_endian(overrides), little_endian(string_offsets)]
+    blocks += [memoryview(b"".join(encoded))]
+
+    offsets = []
+    position = HEADER.size
+    for block in blocks:
+        position = (position + 7) & ~7
+        offsets.append(position)
+        position += len(block)
+
+    tmp_path = f"{archive_path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, ARCHIVE_VERSION, len(months), len(venue_codes), len(columns["days"]),
+                            len(encoded), len(overrides) // 2, *offsets))
+        for offset, block in zip(offsets, blocks):
+            f.write(b"\0" * (offset - f.tell()))
+            f.write(block)
+    os.replace(tmp_path, archive_path)
+    return len(columns["days"])
+
+
+class EventArchive:
+    """
+    Read-only view of an archive. days, minutes, venues, attendance, names and times
+    are zero-copy memoryviews over the mapped file (copies on big-endian machines), and
+    strings are only decoded when asked for.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+        magic, version, n_months, n_venues, n_rows, n_strings, n_overrides, *offsets = HEADER.unpack_from(self._view)
+        if magic != MAGIC or version != ARCHIVE_VERSION:
+            self.close()
+            raise ValueError(f"{path} isn't a version {ARCHIVE_VERSION} event archive")
+        offsets = dict(zip(BLOCKS, offsets))
+
+        def block(name, typecode, count):
+            raw = self._view[offsets[name]:offsets[name] + count * array(typecode).itemsize]
+            if sys.byteorder == "little":
+                return raw.cast(typecode)
+            copied = array(typecode, raw.tobytes())
+            copied.byteswap()
+            return copied
+
+        for name, typecode in COLUMNS:
+            setattr(self, name, block(name, typecode, n_rows))
+        self._string_offsets = block("string_offsets", "I", n_strings + 1)
+        self._string_data = self._view[offsets["string_data"]:offsets["string_data"] + self._string_offsets[n_strings]]
+        overrides = block("overrides", "I", n_overrides * 2)
+        self.overrides = dict(zip(overrides[0::2], overrides[1::2]))
+        self.venue_codes = [self.string(i) for i in block("venue_codes", "I", n_venues)]
+
+        self.months = {}
+        for i in range(n_months):
+            year, month, flags, first_row, row_count, raw, mtime_ns, size = MONTH.unpack_from(
+                self._view, offsets["months"] + i * MONTH.size)
+            self.months[year, month] = ArchiveMonth(flags, first_row, row_count, raw, (mtime_ns, size))
+        self._clean_names = {}
+
+    def close(self):
+        # The views have to go before the mapping can be closed
+        for name in [name for name, _ in COLUMNS] + ["_string_offsets", "_string_data"]:
+            value = getattr(self, name, None)
+            if isinstance(value, memoryview):
+                value.release()
+        self._view.release()
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return len(self.days)
+
+    def has_month(self, year, month):
+        return (year, month) in self.months
+
+    def string(self, i):
+        return str(self._string_data[self._string_offsets[i]:self._string_offsets[i + 1]], "utf-8")
+
+    def clean_name(self, name_id):
+        if name_id not in self._clean_names:
+            self._clean_names[name_id] = clean_event_name(self.string(name_id))
+        return self._clean_names[name_id]
+
+    def month_rows(self, year, month):
+        """The month's events as (date, time_str, minute, venue, name, attendance), like read_month_file."""
+        entry = self.months[year, month]
+        rows = []
+        for i in range(entry.first_row, entry.first_row + entry.row_count):
+            if self.venues[i] == SKIPPED_VENUE:
+                continue
+            rows.append((
+                date.fromordinal(self.days[i]),
+                normalize_time_display(self.string(self.times[i])),
+                self.minutes[i],
+                self.venue_codes[self.venues[i]],
+                self.clean_name(self.names[i]),
+                self.attendance[i],
+            ))
+        return rows
+
+    def index(self):
+        """An EventIndex over the whole archive, as load_index would build from the CSVs."""
+        rows = []
+        for ym in sorted(self.months):
+            rows.extend(self.month_rows(*ym))
+        index = EventIndex(rows, self.months)
+        index.signatures = {ym: entry.signature for ym, entry in self.months.items()}
+        index.folder = os.path.dirname(os.path.abspath(self.path))
+        return index
+
+    def is_current(self, csv_folder):
+        """Whether the archive still matches every month file in csv_folder."""
+        files = find_month_files(csv_folder)
+        return files.keys() == self.months.keys() and all(
+            file_signature(path) == self.months[ym].signature for ym, path in files.items())
+
+    def csv_text(self, year, month):
+        """The month's CSV exactly as it was archived."""
+        entry = self.months[year, month]
+        if entry.raw != NONE:
+            return self.string(entry.raw)
+        rows = []
+        for i in range(entry.first_row, entry.first_row + entry.row_count):
+            if i in self.overrides:
+                rows.append(json.loads(self.string(self.overrides[i])))
+                continue
+            rows.append([
+                str(date.fromordinal(self.days[i]).day),
+                self.string(self.times[i]),
+                self.venue_codes[self.venues[i]],
+                self.string(self.names[i]),
+                str(self.attendance[i]),
+            ])
+        return render_csv(rows, entry.flags)
+
+    def export_csv(self, folder):
+        """Writes every month back out as YYYY-MM.csv in folder."""
+        os.makedirs(folder, exist_ok=True)
+        for year, month in sorted(self.months):
+            with open(os.path.join(folder, f"{year}-{month:02d}.csv"), "wb") as f:
+                f.write(self.csv_text(year, month).encode("utf-8"))
@@ -0,0 +1,271 @@
+import csv
+import os
+import pickle
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from normalize import NO_TIME, normalize_month
+
+
+# Pattern to extract year and month from filenames like "2025-10.csv"
+FILENAME_PATTERN = re.compile(r"(\d{4})-(\d{2})\.csv")
+
+# On-disk cache of parsed month files, kept in the CSV folder next to them
+CACHE_FILE = ".event-cache.pickle"
+# Bump when the cached row layout changes so stale caches get thrown away
+CACHE_VERSION = 2
+
+# Anything pickle.load can raise on a cache that's truncated, corrupt or was written
+# by a version of the scripts whose classes have since moved
+CACHE_ERRORS = (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError, IndexError, KeyError, TypeError, ValueError)
+
+# How many month files iter_window reads at once
+WINDOW_READERS = 4
+
+# One event as handed back by the index
+Event = namedtuple("Event", ["date", "time_str", "minute", "venue", "name", "attendance"])
+
+
+# Full datetime for an event, or None if its time couldn't be parsed
+def event_time(ev):
+    if ev.minute == NO_TIME:
+        return None
+    return datetime(ev.date.year, ev.date.month, ev.date.day) + timedelta(minutes=ev.minute)
+
+
+def find_month_files(csv_folder):
+    month_files = {}
+    for file in Path(csv_folder).glob("*.csv"):
+        match = FILENAME_PATTERN.match(file.name)
+        if not match:
+            continue
+        month_files[(int(match.group(1)), int(match.group(2)))] = file
+    return month_files
+
+def read_month_file(path, year, month):
+    """
+    Reads one month CSV into a list of (date, time_str, minute, venue, name, attendance)
+    tuples in file order. Rows with an invalid day or attendance are skipped.
+    """
+    with open(path, newline='', encoding='utf-8') as csvfile:
+        return list(normalize_month(csv.reader(csvfile), year, month))
+
+def read_month_window(path, year, month, start, end):
+    """
+    The rows of one month file dated start..end (inclusive dates), in the order an
+    EventIndex would hold them. While the file is in date order, reading stops at the
+    first row past end.
+    """
+    rows = []
+    in_order = True
+    last = None
+    with open(path, newline='', encoding='utf-8') as csvfile:
+        for parsed in normalize_month(csv.reader(csvfile), year, month):
+            day = parsed[0]
+            in_order = in_order and (last is None or day >= last)
+            last = day
+            if day > end:
+                if in_order:
+                    break
+                continue
+            if day >= start:
+                rows.append(parsed)
+    rows.sort(key=lambda r: r[0])
+    return rows
+
+def month_span(start, end):
+    """(year, month) for every month from start's through end's."""
+    year, month = start.year, start.month
+    while (year, month) <= (end.year, end.month):
+        yield year, month
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+def iter_window(csv_folder, start, end, max_workers=WINDOW_READERS):
+    """
+    Yields the rows dated start..end (inclusive dates) in date order, reading only the
+    month files the window touches. Those are read concurrently, and each month's rows
+    are handed out as soon as that month and the ones before it are in, so the cost
+    follows the window rather than the size of the history. Closing the generator
+    early cancels whatever hasn't been read yet.
+    """
+    start = start.date() if isinstance(start, datetime) else start
+    end = end.date() if isinstance(end, datetime) else end
+    folder = Path(csv_folder)
+    paths = [(ym, folder / f"{ym[0]}-{ym[1]:02d}.csv") for ym in month_span(start, end)]
+    paths = [(ym, path) for ym, path in paths if path.is_file()]
+    if not paths:
+        return
+
+    executor = ThreadPoolExecutor(min(max_workers, len(paths)))
+    try:
+        futures = [executor.submit(read_month_window, path, *ym, start, end) for ym, path in paths]
+        for future in futures:
+            yield from future.result()
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def load_window(csv_folder, start, end, max_workers=WINDOW_READERS):
+    """
+    An EventIndex over just start..end, built with iter_window. has_month answers for
+    the months in the window that have a file. Nothing is cached, so for a script that
+    runs over and over load_index(csv_folder).window(start, end) is cheaper.
+    """
+    start = start.date() if isinstance(start, datetime) else start
+    end = end.date() if isinstance(end, datetime) else end
+    folder = Path(csv_folder)
+    months = [ym for ym in month_span(start, end) if (folder / f"{ym[0]}-{ym[1]:02d}.csv").is_file()]
+    index = EventIndex(iter_window(csv_folder, start, end, max_workers), months)
+    index.folder = str(csv_folder)
+    return index
+
+
+class EventIndex:
+    """
+    Date-sorted columnar index over every loaded event. Events on the same day keep
+    their original file order. Lookups by date range, optionally narrowed to one
+    venue code, are binary searches over the day column.
+    """
+
+    def __init__(self, rows, months=()):
+        rows = sorted(rows, key=lambda r: r[0])
+        self.months = set(months)
+        # (mtime, size) of each month file the rows came from, filled in by load_index
+        self.signatures = {}
+        # The CSV folder the rows came from, where caches derived from them are kept
+        self.folder = None
+        self.venue_codes = sorted({r[3] for r in rows})
+        venue_ids = {code: i for i, code in enumerate(self.venue_codes)}
+
+        self.days = array("l", (r[0].toordinal() for r in rows))
+        self.minutes = array("h", (r[2] for r in rows))
+        self.venues = array("B", (venue_ids[r[3]] for r in rows))
+        self.attendance = array("l", (r[5] for r in rows))
+        self.times = [r[1] for r in rows]
+        self.names = [r[4] for r in rows]
+
+        # Per-venue row positions and days, so venue queries don't scan other venues
+        self._venue_rows = {code: array("l") for code in self.venue_codes}
+        self._venue_days = {code: array("l") for code in self.venue_codes}
+        for i, venue_id in enumerate(self.venues):
+            code = self.venue_codes[venue_id]
+            self._venue_rows[code].append(i)
+            self._venue_days[code].append(self.days[i])
+
+    def __len__(self):
+        return len(self.days)
+
+    def has_month(self, year, month):
+        return (year, month) in self.months
+
+    def event(self, i):
+        return Event(
+            date.fromordinal(self.days[i]),
+            self.times[i],
+            self.minutes[i],
+            self.venue_codes[self.venues[i]],
+            self.names[i],
+            self.attendance[i],
+        )
+
+    def positions(self, start, end, venue=None):
+        """Row positions for events between start and end (inclusive dates)."""
+        lo_day, hi_day = start.toordinal(), end.toordinal()
+        if venue is None:
+            return range(bisect_left(self.days, lo_day), bisect_right(self.days, hi_day))
+        if venue not in self._venue_days:
+            return []
+        venue_days = self._venue_days[venue]
+        lo = bisect_left(venue_days, lo_day)
+        hi = bisect_right(venue_days, hi_day)
+        return self._venue_rows[venue][lo:hi]
+
+    def between(self, start, end, venue=None):
+        return [self.event(i) for i in self.positions(start, end, venue)]
+
+    def on(self, day, venue=None):
+        return self.between(day, day, venue)
+
+    def window(self, start, end):
+        """A smaller index holding only the events between start and end (inclusive dates)."""
+        sub = EventIndex(self.between(start, end), self.months)
+        sub.signatures = self.signatures
+        sub.folder = self.folder
+        return sub
+
+
+def file_signature(path):
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+def cache_path(csv_folder, cache_file):
+    """
+    Where cache_file lives: relative names go in csv_folder, next to the month files
+    they were built from. None (no cache) and absolute paths are passed through.
+    """
+    if not cache_file or not csv_folder:
+        return cache_file
+    return os.path.join(csv_folder, cache_file)
+
+def read_cache(cache_file, version):
+    """
+    The dict stored in cache_file, or None if there's no cache, it can't be read or
+    it was written with a different version.
+    """
+    if not cache_file:
+        return None
+    try:
+        with open(cache_file, "rb") as f:
+            cache = pickle.load(f)
+    except CACHE_ERRORS:
+        return None
+    if not isinstance(cache, dict) or cache.get("version") != version:
+        return None
+    return cache
+
+def write_cache(cache_file, version, cache):
+    # Write to a temp file first so a crashed run never leaves a half-written cache
+    tmp_file = f"{cache_file}.tmp"
+    with open(tmp_file, "wb") as f:
+        pickle.dump({**cache, "version": version}, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_file, cache_file)
+
+def load_index(csv_folder, cache_file=CACHE_FILE):
+    """
+    Builds the EventIndex for every month file in csv_folder. Parsed rows are kept
+    in cache_file (in csv_folder unless it's an absolute path), keyed per file by
+    mtime and size, so only month files that changed since the last run get reparsed.
+    If nothing changed the whole index comes straight out of the cache. Pass cache_file=None to skip the cache.
+    """
+    month_files = find_month_files(csv_folder)
+    signatures = {ym: file_signature(file) for ym, file in month_files.items()}
+
+    cache_file = cache_path(csv_folder, cache_file)
+    cache = read_cache(cache_file, CACHE_VERSION)
+    if cache is None:
+        cache = {"months": {}, "signatures": None, "index": None}
+    if cache["signatures"] == signatures and cache["index"] is not None:
+        index = cache["index"]
+        index.folder = str(csv_folder)
+        return index
+
+    rows = []
+    months = {}
+    for ym, file in sorted(month_files.items()):
+        cached = cache["months"].get(ym)
+        if cached and cached[0] == signatures[ym]:
+            month_rows = cached[1]
+        else:
+            month_rows = read_month_file(file, *ym)
+        months[ym] = (signatures[ym], month_rows)
+        rows.extend(month_rows)
+
+    index = EventIndex(rows, month_files.keys())
+    index.signatures = signatures
+    index.folder = str(csv_folder)
+    if cache_file:
+        write_cache(cache_file, CACHE_VERSION, {"months": months, "signatures": signatures, "index": index})
+    return index
@@ -0,0 +1,183 @@
+import os
+import re
+import calendar
+import hashlib
+from datetime import date, datetime, timedelta, timezone
+from event_store import NO_TIME, cache_path, read_cache, write_cache
+from normalize import LOCATION_MAP, DURATION_MINUTES, DEFAULT_DURATION_MINUTES
+
+
+# iCalendar feeds of the event data, one combined feed plus one per venue. Each month's
+# VEVENTs are rendered once and kept with the signature of the month file they came
+# from, so a run only re-renders months whose CSV changed. Feeds are streamed to disk
+# fragment by fragment rather than built up as one string.
+
+# Rendered month fragments, kept in the CSV folder
+FRAGMENT_FILE = ".ics-fragments.pickle"
+FRAGMENT_VERSION = 1
+
+COMBINED_FEED = "stadium-events.ics"
+VENUE_FEED = "stadium-events-{venue}.ics"
+
+UID_DOMAIN = "philadelphia-stadium-events"
+TZID = "America/New_York"
+
+VTIMEZONE = [
+    "BEGIN:VTIMEZONE",
+    f"TZID:{TZID}",
+    "BEGIN:DAYLIGHT",
+    "TZOFFSETFROM:-0500",
+    "TZOFFSETTO:-0400",
+    "TZNAME:EDT",
+    "DTSTART:19700308T020000",
+    "RRULE:FREQ=YEARLY;BYMONTH=3;BYDAY=2SU",
+    "END:DAYLIGHT",
+    "BEGIN:STANDARD",
+    "TZOFFSETFROM:-0400",
+    "TZOFFSETTO:-0500",
+    "TZNAME:EST",
+    "DTSTART:19701101T020000",
+    "RRULE:FREQ=YEARLY;BYMONTH=11;BYDAY=1SU",
+    "END:STANDARD",
+    "END:VTIMEZONE",
+]
+
+
+def escape_text(text):
+    return text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+def fold(line):
+    # Content lines are limited to 75 octets, continuations start with a space
+    if len(line.encode("utf-8")) <= 75:
+        return line + "\r\n"
+    parts = []
+    current, size = "", 0
+    for char in line:
+        width = len(char.encode("utf-8"))
+        if size + width > (75 if not parts else 74):
+            parts.append(current)
+            current, size = "", 0
+        current += char
+        size += width
+    parts.append(current)
+    return "\r\n ".join(parts) + "\r\n"
+
+def feed_filename(venue):
+    # Venue codes like "XF!" or "FDR Park" aren't nice in a URL
+    return VENUE_FEED.format(venue=re.sub(r"[^A-Za-z0-9]", "", venue) or "other")
+
+def event_uid(ev):
+    # Stable across re-renders so subscribed calendars update events in place
+    key = f"{ev.date.isoformat()}|{ev.venue}|{ev.time_str}|{ev.name}"
+    return f"{hashlib.sha1(key.encode('utf-8')).hexdigest()[:20]}@{UID_DOMAIN}"
+
+def render_event(ev, stamp):
+    location = LOCATION_MAP.get(ev.venue, ev.venue)
+    lines = ["BEGIN:VEVENT", f"UID:{event_uid(ev)}", f"DTSTAMP:{stamp}"]
+    if ev.minute == NO_TIME:
+        lines.append(f"DTSTART;VALUE=DATE:{ev.date.strftime('%Y%m%d')}")
+        lines.append(f"DTEND;VALUE=DATE:{(ev.date + timedelta(days=1)).strftime('%Y%m%d')}")
+    else:
+        start = datetime(ev.date.year, ev.date.month, ev.date.day) + timedelta(minutes=ev.minute)
+        end = start + timedelta(minutes=DURATION_MINUTES.get(ev.venue, DEFAULT_DURATION_MINUTES))
+        lines.append(f"DTSTART;TZID={TZID}:{start.strftime('%Y%m%dT%H%M%S')}")
+        lines.append(f"DTEND;TZID={TZID}:{end.strftime('%Y%m%dT%H%M%S')}")
+    lines.append(f"SUMMARY:{escape_text(ev.name)}")
+    lines.append(f"LOCATION:{escape_text(location)}")
+    lines.append(f"DESCRIPTION:{escape_text(f'Expected attendance: {ev.attendance:,}')}")
+    lines.append("END:VEVENT")
+    return "".join(fold(line) for line in lines)
+
+def render_month(index, year, month, signature):
+    """
+    {venue code: VEVENT text} for one month. Event names in the index have already
+    been through clean_event_name. DTSTAMP comes from the month file's mtime so an
+    unchanged month always renders to the same text.
+    """
+    mtime_ns = signature[0] if signature else 0
+    stamp = datetime.fromtimestamp(mtime_ns / 1e9, timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    first = date(year, month, 1)
+    last = date(year, month, calendar.monthrange(year, month)[1])
+    fragments = {}
+    for i in index.positions(first, last):
+        ev = index.event(i)
+        fragments.setdefault(ev.venue, []).append(render_event(ev, stamp))
+    return {venue: "".join(events) for venue, events in fragments.items()}
+
+def load_fragments(index, fragment_file=FRAGMENT_FILE):
+    """
+    Returns ({(year, month): {venue: text}}, changed venues, months to save). Months
+    whose file signature matches the stored one are reused as-is. changed is every
+    venue whose feed content differs from the last run, or None if there was nothing
+    stored. Months to save is None when the stored fragments are still current,
+    otherwise it goes to save_fragments once the feeds have been written.
+    """
+    fragment_file = cache_path(index.folder, fragment_file)
+    cache = read_cache(fragment_file, FRAGMENT_VERSION)
+    stored = cache["months"] if cache else {}
+
+    signatures = index.signatures or {ym: None for ym in index.months}
+    months = {}
+    changed = set()
+    for ym, sig in sorted(signatures.items()):
+        if index.signatures and ym in stored and stored[ym][0] == sig:
+            months[ym] = stored[ym]
+            continue
+        fragments = render_month(index, *ym, sig)
+        old = stored[ym][1] if ym in stored else {}
+        changed |= {venue for venue in fragments.keys() | old.keys() if fragments.get(venue) != old.get(venue)}
+        months[ym] = (sig, fragments)
+    for ym in stored.keys() - months.keys():
+        changed |= stored[ym][1].keys()
+
+    to_save = months if changed or stored.keys() != months.keys() else None
+    return {ym: fragments for ym, (_, fragments) in months.items()}, (changed if stored else None), to_save
+
+def save_fragments(index, months, fragment_file=FRAGMENT_FILE):
+    fragment_file = cache_path(index.folder, fragment_file)
+    if fragment_file and index.signatures and months is not None:
+        write_cache(fragment_file, FRAGMENT_VERSION, {"months": months})
+
+def write_feed(path, name, pieces):
+    # Stream header, month fragments and footer straight into a temp file
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+        f.write("BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//PhiladelphiaStadiumEvents//EN\r\n")
+        f.write("CALSCALE:GREGORIAN\r\nMETHOD:PUBLISH\r\n")
+        f.write(fold(f"X-WR-CALNAME:{escape_text(name)}"))
+        f.write(f"X-WR-TIMEZONE:{TZID}\r\n")
+        f.write("".join(line + "\r\n" for line in VTIMEZONE))
+        for piece in pieces:
+            f.write(piece)
+        f.write("END:VCALENDAR\r\n")
+    os.replace(tmp_path, path)
+
+def export_feeds(index, feed_folder, fragment_file=FRAGMENT_FILE):
+    """
+    Writes the combined feed and one feed per venue into feed_folder. Only feeds whose
+    events changed since the last run (or that are missing) are rewritten. Returns the
+    paths that were written.
+    """
+    os.makedirs(feed_folder, exist_ok=True)
+    months, changed, to_save = load_fragments(index, fragment_file)
+    venues = sorted({venue for fragments in months.values() for venue in fragments})
+
+    written = []
+    feeds = [(COMBINED_FEED, "Philadelphia stadium events", None)]
+    feeds += [(feed_filename(venue), f"Events at {LOCATION_MAP.get(venue, venue)}", venue)
+              for venue in venues]
+    for filename, name, venue in feeds:
+        path = os.path.join(feed_folder, filename)
+        stale = changed is None or (bool(changed) if venue is None else venue in changed)
+        if not stale and os.path.exists(path):
+            continue
+        if venue is None:
+            pieces = (text for ym in sorted(months) for _, text in sorted(months[ym].items()))
+        else:
+            pieces = (months[ym][venue] for ym in sorted(months) if venue in months[ym])
+        write_feed(path, name, pieces)
+        written.append(path)
+    # Only remember the fragments once every feed built from them is on disk, so a
+    # failed run rewrites its stale feeds next time
+    save_fragments(index, to_save, fragment_file)
+    return written
@@ -0,0 +1,142 @@
+import os
+import sys
+import json
+import time
+import atexit
+import threading
+from collections import defaultdict
+from contextlib import nullcontext
+from functools import wraps
+
+
+# Span timers and counters for the scripts, off unless STADIUM_EVENTS_METRICS is set.
+#
+#   STADIUM_EVENTS_METRICS=metrics.jsonl   appends one JSON line per span and counter
+#   STADIUM_EVENTS_METRICS=metrics.prom    rewrites a Prometheus text file each run
+#   STADIUM_EVENTS_PROFILE=run.pstats      also runs the whole script under cProfile
+#
+# When it's off, span() hands back one shared no-op context manager and count() returns
+# straight away, so leaving the calls in the hot paths costs next to nothing.
+
+METRICS_PATH = os.environ.get("STADIUM_EVENTS_METRICS")
+PROFILE_PATH = os.environ.get("STADIUM_EVENTS_PROFILE")
+ENABLED = bool(METRICS_PATH)
+
+NULL_SPAN = nullcontext()
+
+# Spans can be recorded from the download threads
+_lock = threading.Lock()
+_spans = []
+_totals = defaultdict(lambda: [0, 0.0])  # name -> [count, seconds]
+_counters = defaultdict(int)
+
+
+class Span:
+    __slots__ = ("name", "labels", "started")
+
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        record(self.name, time.perf_counter() - self.started, exc_type is not None, self.labels)
+        return False
+
+
+def record(name, seconds, error=False, labels=None):
+    """Adds a span timed elsewhere, e.g. in a worker process that can't report itself."""
+    if not ENABLED:
+        return
+    entry = {"type": "span", "name": name, "seconds": seconds, "error": error}
+    if labels:
+        entry["labels"] = labels
+    with _lock:
+        _spans.append(entry)
+        total = _totals[name]
+        total[0] += 1
+        total[1] += seconds
+
+def span(name, **labels):
+    """Times the with block it's used in, e.g. `with span("load_index"): ...`."""
+    if not ENABLED:
+        return NULL_SPAN
+    return Span(name, labels)
+
+def count(name, n=1):
+    if not ENABLED:
+        return
+    with _lock:
+        _counters[name] += n
+
+def timed(name):
+    """Decorator version of span(). With metrics off the function is returned as is."""
+    def decorate(fn):
+        if not ENABLED:
+            return fn
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with Span(name, None):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def script_name():
+    return os.path.basename(sys.argv[0]) if sys.argv and sys.argv[0] else "python"
+
+def prometheus_name(name):
+    return "".join(c if c.isalnum() else "_" for c in name)
+
+def write_jsonl(path):
+    run = {"script": script_name(), "pid": os.getpid(), "time": time.time()}
+    with open(path, "a") as f:
+        for entry in _spans:
+            f.write(json.dumps({**run, **entry}) + "\n")
+        for name, value in sorted(_counters.items()):
+            f.write(json.dumps({**run, "type": "counter", "name": name, "value": value}) + "\n")
+
+def write_prometheus(path):
+    script = script_name()
+    lines = [
+        "# HELP stadium_events_span_seconds Time spent in each instrumented stage",
+        "# TYPE stadium_events_span_seconds summary",
+    ]
+    for name, (n, seconds) in sorted(_totals.items()):
+        labels = f'script="{script}",span="{name}"'
+        lines.append(f"stadium_events_span_seconds_sum{{{labels}}} {seconds:.6f}")
+        lines.append(f"stadium_events_span_seconds_count{{{labels}}} {n}")
+    for name, value in sorted(_counters.items()):
+        metric = f"stadium_events_{prometheus_name(name)}_total"
+        lines.append(f"# TYPE {metric} counter")
+        lines.append(f'{metric}{{script="{script}"}} {value}')
+    # Written whole and swapped in, so a scraper never reads half a file
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+    os.replace(tmp_path, path)
+
+def flush():
+    """Writes out everything recorded so far. Runs by itself when the script exits."""
+    if not ENABLED:
+        return
+    with _lock:
+        if METRICS_PATH.endswith(".prom"):
+            write_prometheus(METRICS_PATH)
+        else:
+            write_jsonl(METRICS_PATH)
+            _counters.clear()
+        _spans.clear()
+
+
+if ENABLED:
+    atexit.register(flush)
+
+if PROFILE_PATH:
+    import cProfile
+    _profiler = cProfile.Profile()
+    _profiler.enable()
+    atexit.register(lambda: (_profiler.disable(), _profiler.dump_stats(PROFILE_PATH)))
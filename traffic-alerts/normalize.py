@@ -0,0 +1,138 @@
+import re
+from datetime import date
+
+
+# Turns raw month CSV rows into the (date, time_str, minute, venue, name, attendance)
+# tuples the rest of the scripts work with. A month repeats the same handful of event
+# names, times and venues over and over, so each distinct raw value is cleaned once
+# and every later row gets the same (interned) result back from a lookup table.
+
+CSV_FIELDS = ["Date", "Time", "Location", "Event Name", "Attendance"]
+
+# Location conversion map
+LOCATION_MAP = {
+    "CBP": "the Bank",
+    "LFF": "the Linc",
+    "WFC": "the Wells Fargo Center",
+    "XF!": "Xfinity Live",
+    "XMA": "Xfinity Mobile Arena (fka the Wells Fargo Center)",
+    "SL!": "Stateside Live! (fka Xfinity Live!)"
+}
+
+# How long an event keeps its crowd around, in minutes from the start time, per venue
+DEFAULT_DURATION_MINUTES = 180
+DURATION_MINUTES = {
+    "CBP": 180,   # baseball
+    "LFF": 210,   # football, with the longest walk out
+    "XMA": 150,
+    "WFC": 150,
+    "XF!": 240,
+    "SL!": 240,
+}
+
+# Team names the calendars shout, and how the alerts write them
+TEAM_NAMES = {
+    "PHILLIES": "Phillies",
+    "FLYERS": "Flyers",
+    "EAGLES": "Eagles",
+    "SIXERS": "Sixers",
+}
+TEAM_PATTERN = re.compile("|".join(TEAM_NAMES))
+
+# Normalized times ("6:30pm", "1pm"), accepting exactly what strptime's %I:%M%p and %I%p do
+TIME_PATTERN = re.compile(r"(1[0-2]|0[1-9]|[1-9])(?::([0-5]\d|\d))?([ap]m)", re.IGNORECASE)
+
+# Minute-of-day stored for events whose time couldn't be parsed
+NO_TIME = -1
+
+# Intern tables: raw value -> normalized value, shared by every month read in this process
+_names = {}
+_times = {}
+_venues = {}
+
+
+def clean_event_name(name):
+    """The event name with team names in title case and anything after ">>>" dropped."""
+    return TEAM_PATTERN.sub(lambda m: TEAM_NAMES[m.group()], name.split(">>>")[0]).strip()
+
+def normalize_time_display(time_str):
+    return time_str.lower().replace(" ", "")
+
+def parse_minute(time_str):
+    """Minutes after midnight for a normalized time string ("6:30pm", "1pm"), or None."""
+    match = TIME_PATTERN.fullmatch(time_str)
+    if not match:
+        return None
+    hour, minute, meridiem = match.groups()
+    hour = int(hour) % 12 + (12 if meridiem.lower() == "pm" else 0)
+    return hour * 60 + (int(minute) if minute else 0)
+
+def venue_name(code):
+    return LOCATION_MAP.get(code, code)
+
+def intern_name(raw):
+    """clean_event_name, memoized and interned."""
+    name = _names.get(raw)
+    if name is None:
+        name = _names[raw] = clean_event_name(raw)
+    return name
+
+def intern_time(raw):
+    """(display time, minute of day or NO_TIME) for a raw Time field, memoized."""
+    parsed = _times.get(raw)
+    if parsed is None:
+        display = normalize_time_display(raw)
+        minute = parse_minute(display)
+        parsed = _times[raw] = (display, NO_TIME if minute is None else minute)
+    return parsed
+
+def intern_venue(raw):
+    return _venues.setdefault(raw, raw)
+
+
+def normalize_month(records, year, month):
+    """
+    Yields a (date, time_str, minute, venue, name, attendance) tuple for every row of
+    a month CSV, given as csv.reader records with the header first. Rows with an
+    invalid day or attendance are skipped, and columns are found by header name the
+    way csv.DictReader finds them.
+    """
+    records = iter(records)
+    header = next(records, None)
+    if header is None:
+        return
+    # DictReader keeps the last column of a repeated name and fills missing ones with None
+    positions = {field: i for i, field in enumerate(header)}
+    date_col, time_col, venue_col, name_col, attendance_col = (positions.get(f) for f in CSV_FIELDS)
+    width = len(header)
+
+    # Day and attendance strings repeat as much as names do
+    days = {}
+    attendances = {}
+    for fields in records:
+        if not fields:
+            continue
+        if len(fields) < width:
+            fields = fields + [None] * (width - len(fields))
+        raw_day = None if date_col is None else fields[date_col]
+        raw_attendance = None if attendance_col is None else fields[attendance_col]
+        try:
+            event_date = days[raw_day]
+        except KeyError:
+            try:
+                event_date = date(year, month, int(raw_day))
+            except (TypeError, ValueError):
+                event_date = None
+            days[raw_day] = event_date
+        try:
+            attendance = attendances[raw_attendance]
+        except KeyError:
+            try:
+                attendance = int(raw_attendance)
+            except (TypeError, ValueError):
+                attendance = None
+            attendances[raw_attendance] = attendance
+        if event_date is None or attendance is None:
+            continue
+        time_str, minute = intern_time(fields[time_col])
+        yield (event_date, time_str, minute, intern_venue(fields[venue_col]), intern_name(fields[name_col]), attendance)
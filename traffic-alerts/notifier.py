@@ -0,0 +1,142 @@
+import asyncio
+from collections import defaultdict
+from render import chunk_message, discord_chunks
+from instrument import span, count
+
+
+# How many channels get sent to at the same time
+MAX_CONCURRENT_CHANNELS = 4
+
+
+class Notifier:
+    """
+    Collects messages for any number of channels during a run and sends them all in one
+    go with flush() (or send() from sync code). Messages for the same channel go out in
+    the order they were queued, separate channels are sent to concurrently.
+    Subclasses provide open(), close() and deliver(channel_id, content).
+    """
+
+    def __init__(self, max_concurrent=MAX_CONCURRENT_CHANNELS):
+        self.pending = defaultdict(list)
+        self.max_concurrent = max_concurrent
+
+    def queue(self, channel_id, content):
+        self.pending[channel_id].append(content)
+
+    def queue_lines(self, channel_id, lines):
+        for part in chunk_message(lines):
+            self.queue(channel_id, part)
+
+    def queue_summary(self, channel_id, summary):
+        # Chunks are cached per summary, channels getting the same one share them
+        for part in discord_chunks(summary):
+            self.queue(channel_id, part)
+
+    async def open(self):
+        pass
+
+    async def close(self):
+        pass
+
+    async def deliver(self, channel_id, content):
+        raise NotImplementedError
+
+    async def flush(self):
+        if not self.pending:
+            return
+        pending, self.pending = self.pending, defaultdict(list)
+        semaphore = asyncio.Semaphore(self.max_concurrent)
+
+        async def send_channel(channel_id, messages):
+            async with semaphore:
+                for content in messages:
+                    await self.deliver(channel_id, content)
+                    count("messages_sent")
+
+        with span("notifier_flush", notifier=type(self).__name__):
+            with span("notifier_open"):
+                await self.open()
+            try:
+                await asyncio.gather(*(send_channel(cid, msgs) for cid, msgs in pending.items()))
+            finally:
+                await self.close()
+
+    def send(self):
+        asyncio.run(self.flush())
+
+
+class DiscordNotifier(Notifier):
+    """
+    Sends through the bot's REST API with one login per flush, no gateway connection.
+    discord.py's HTTP client already waits out per-route and global rate limits.
+    """
+
+    def __init__(self, token, **kwargs):
+        super().__init__(**kwargs)
+        self.token = token
+        self.client = None
+        self.channels = {}
+
+    async def open(self):
+        import discord
+        self.client = discord.Client(intents=discord.Intents.default())
+        await self.client.login(self.token)
+
+    async def close(self):
+        if self.client:
+            await self.client.close()
+        self.client = None
+        self.channels = {}
+
+    async def deliver(self, channel_id, content):
+        if channel_id not in self.channels:
+            self.channels[channel_id] = await self.client.fetch_channel(channel_id)
+        await self.channels[channel_id].send(content)
+
+
+class WebhookNotifier(Notifier):
+    """
+    Posts to Discord webhooks over a single aiohttp session. webhooks maps each channel
+    id to its webhook URL. 429 responses are retried after the server's retry_after, and
+    a bucket that reports no remaining requests is waited out before the next post.
+    """
+
+    def __init__(self, webhooks, max_retries=5, **kwargs):
+        super().__init__(**kwargs)
+        self.webhooks = webhooks
+        self.max_retries = max_retries
+        self.session = None
+
+    async def open(self):
+        import aiohttp
+        self.session = aiohttp.ClientSession()
+
+    async def close(self):
+        if self.session:
+            await self.session.close()
+        self.session = None
+
+    async def deliver(self, channel_id, content):
+        url = self.webhooks[channel_id]
+        for _ in range(self.max_retries):
+            async with self.session.post(url, json={"content": content}) as response:
+                if response.status == 429:
+                    body = await response.json()
+                    await asyncio.sleep(float(body.get("retry_after", 1)))
+                    continue
+                response.raise_for_status()
+                if response.headers.get("X-RateLimit-Remaining") == "0":
+                    await asyncio.sleep(float(response.headers.get("X-RateLimit-Reset-After", 0)))
+                return
+        raise RuntimeError(f"Gave up posting to channel {channel_id} after {self.max_retries} rate-limited attempts")
+
+
+class FakeNotifier(Notifier):
+    """Keeps everything it would have sent in self.sent as (channel_id, content) pairs."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.sent = []
+
+    async def deliver(self, channel_id, content):
+        self.sent.append((channel_id, content))
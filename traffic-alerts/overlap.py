@@ -0,0 +1,128 @@
+import numpy as np
+from datetime import date
+from event_store import NO_TIME
+from normalize import DURATION_MINUTES, DEFAULT_DURATION_MINUTES
+
+
+# Every event is modelled as a window from when the crowd starts arriving to when it
+# has left: [start - INGRESS_MINUTES, start + duration], with the duration per venue
+# from normalize.DURATION_MINUTES.
+INGRESS_MINUTES = 90
+
+# Venues whose crowds share the same roads. Anything not listed is its own cluster.
+SPORTS_COMPLEX = "sports-complex"
+VENUE_CLUSTERS = {code: SPORTS_COMPLEX for code in DURATION_MINUTES}
+
+MINUTES_PER_DAY = 24 * 60
+
+
+def column(values):
+    # Zero-copy view of one of the index's array columns
+    return np.frombuffer(values, dtype=values.typecode)
+
+def cluster_of(venue):
+    return VENUE_CLUSTERS.get(venue, venue)
+
+def event_windows(index, start, end, venues=None):
+    """
+    Arrays (cluster ids, ingress minute, egress minute, attendance) for the timed events
+    whose windows can touch start..end (inclusive dates), optionally only at the given
+    venue codes. Minutes are absolute, counted from day 1 of the proleptic calendar, so
+    windows cross midnight naturally. Also returns the cluster names the ids refer to.
+    """
+    # The day before is included for late events that spill past midnight
+    rows = index.positions(date.fromordinal(start.toordinal() - 1), end)
+    lo, hi = rows.start, rows.stop
+
+    days = column(index.days)[lo:hi].astype(np.int64)
+    minutes = column(index.minutes)[lo:hi].astype(np.int64)
+    venue_ids = column(index.venues)[lo:hi]
+    attendance = column(index.attendance)[lo:hi].astype(np.int64)
+
+    timed = minutes != NO_TIME
+    if venues is not None:
+        timed &= np.isin(venue_ids, [i for i, code in enumerate(index.venue_codes) if code in venues])
+    starts = days[timed] * MINUTES_PER_DAY + minutes[timed]
+
+    clusters = sorted({cluster_of(code) for code in index.venue_codes})
+    cluster_ids = {name: i for i, name in enumerate(clusters)}
+    venue_cluster = np.array([cluster_ids[cluster_of(code)] for code in index.venue_codes] or [0], dtype=np.int64)
+    venue_duration = np.array([DURATION_MINUTES.get(code, DEFAULT_DURATION_MINUTES) for code in index.venue_codes] or [0], dtype=np.int64)
+
+    event_venues = venue_ids[timed]
+    return (
+        venue_cluster[event_venues],
+        starts - INGRESS_MINUTES,
+        starts + venue_duration[event_venues],
+        attendance[timed],
+        clusters,
+    )
+
+def sweep(cluster, ingress, egress, attendance):
+    """
+    One sweep over every window boundary, grouped by cluster. Returns, per boundary in
+    sweep order, its (cluster, minute, concurrent attendance, concurrent events) after
+    the boundary is applied. Windows that only touch end to start don't overlap.
+    """
+    n = len(ingress)
+    clusters = np.concatenate([cluster, cluster])
+    times = np.concatenate([ingress, egress])
+    is_start = np.concatenate([np.ones(n, dtype=np.int8), np.zeros(n, dtype=np.int8)])
+    crowd = np.concatenate([attendance, -attendance])
+    counts = np.concatenate([np.ones(n, dtype=np.int64), -np.ones(n, dtype=np.int64)])
+
+    # Ends sort before starts at the same minute. Every cluster's deltas sum to zero,
+    # so one cumulative sum over the cluster-sorted boundaries resets between clusters.
+    order = np.lexsort((is_start, times, clusters))
+    return clusters[order], times[order], np.cumsum(crowd[order]), np.cumsum(counts[order])
+
+def daily_peaks(index, start, end, venues=None):
+    """
+    For each day in start..end, the highest concurrent attendance in any cluster at a
+    moment when at least two event windows overlap. Returns {date: peak}, days without
+    any overlap are left out.
+    """
+    cluster, ingress, egress, attendance, _ = event_windows(index, start, end, venues)
+    if len(ingress) == 0:
+        return {}
+    _, times, load, concurrent = sweep(cluster, ingress, egress, attendance)
+
+    days = times // MINUTES_PER_DAY
+    keep = (concurrent >= 2) & (days >= start.toordinal()) & (days <= end.toordinal())
+    if not keep.any():
+        return {}
+    first_day = start.toordinal()
+    peaks = np.zeros(end.toordinal() - first_day + 1, dtype=np.int64)
+    np.maximum.at(peaks, days[keep] - first_day, load[keep])
+    return {date.fromordinal(first_day + i): int(p) for i, p in enumerate(peaks) if p}
+
+def combined_event_days(index, start, end, threshold=50000, venues=None):
+    """Days in start..end whose overlapping events together draw more than threshold."""
+    return {day for day, peak in daily_peaks(index, start, end, venues).items() if peak > threshold}
+
+def hourly_load(index, start, end, cluster=SPORTS_COMPLEX):
+    """
+    Peak concurrent attendance in cluster for every hour of start..end, as an array of
+    shape (days, 24).
+    """
+    n_days = end.toordinal() - start.toordinal() + 1
+    cluster_ids, ingress, egress, attendance, clusters = event_windows(index, start, end)
+    if cluster not in clusters or len(ingress) == 0:
+        return np.zeros((n_days, 24), dtype=np.int64)
+
+    mine = cluster_ids == clusters.index(cluster)
+    if not mine.any():
+        return np.zeros((n_days, 24), dtype=np.int64)
+    _, times, load, _ = sweep(cluster_ids[mine], ingress[mine], egress[mine], attendance[mine])
+
+    base = start.toordinal() * MINUTES_PER_DAY
+    hour_starts = base + np.arange(n_days * 24, dtype=np.int64) * 60
+
+    # Load carried into each hour from the last boundary before it...
+    before = np.searchsorted(times, hour_starts, side="right") - 1
+    hourly = np.where(before >= 0, load[np.maximum(before, 0)], 0)
+
+    # ...raised by any boundary inside the hour
+    inside = (times >= base) & (times < base + n_days * MINUTES_PER_DAY)
+    np.maximum.at(hourly, (times[inside] - base) // 60, load[inside])
+    return hourly.reshape(n_days, 24)
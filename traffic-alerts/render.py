@@ -0,0 +1,177 @@
+import json
+from html import escape
+from functools import lru_cache
+from collections import namedtuple
+
+
+# Turns a summary into markdown for Discord, plain text, HTML email or JSON. A summary
+# is built out of one DayBlock per day, holding only what that day's text depends on,
+# so every (block, format) is rendered once and reused by any summary or subscriber
+# that ends up with the same day. Discord chunking is cached per rendered summary too,
+# so it can be done up front rather than while a message is being sent.
+
+FORMATS = ("markdown", "text", "html", "json")
+
+# Discord messages are capped at 2000 characters, leave some headroom
+MESSAGE_LIMIT = 1900
+
+# How many rendered blocks and summaries to keep around
+CACHE_SIZE = 4096
+
+# One event as it's shown, with its early/large warnings already decided
+EventLine = namedtuple("EventLine", ["time_str", "name", "location", "early", "large"])
+
+# One day of a summary. kind is "daily" (every event on its own dated line) or "weekly"
+# (days with several events listed under one heading). combined marks a weekly day
+# whose events add up to a large crowd.
+DayBlock = namedtuple("DayBlock", ["kind", "date", "events", "combined"])
+
+# A whole summary. quiet_message replaces everything but the notes when no day is
+# disruptive (None for no message at all), notes are warnings that always go at the end.
+Summary = namedtuple("Summary", ["kind", "title", "blocks", "quiet_message", "notes"])
+
+EARLY_WARNING = "☀️ Early event warning ☀️"
+LARGE_WARNING = "🚨 Large event 🚨"
+COMBINED_WARNING = "📣📣 Large combined events 📣📣"
+
+
+def disruptive(block):
+    return (block.combined and len(block.events) > 1) or any(ev.early or ev.large for ev in block.events)
+
+def is_quiet(summary):
+    return not any(disruptive(block) for block in summary.blocks)
+
+@lru_cache(maxsize=CACHE_SIZE)
+def date_label(day):
+    # (weekday, month/day), e.g. ("Sun", "9/14")
+    return day.strftime("%a"), day.strftime("%-m/%-d")
+
+
+def markdown_warnings(ev):
+    return ("\t*" + EARLY_WARNING + "*" if ev.early else "") + ("\t*" + LARGE_WARNING + "*" if ev.large else "")
+
+def markdown_block(block):
+    weekday, formatted_date = date_label(block.date)
+    if block.kind == "daily" or len(block.events) == 1:
+        return tuple(f"* **{weekday}, {formatted_date} at {ev.time_str}:** {ev.name} at {ev.location}{markdown_warnings(ev)}"
+                     for ev in block.events)
+    heading = f"* **{weekday}, {formatted_date}**, there are {len(block.events)} events:"
+    if block.combined:
+        heading += f"\t\t*{COMBINED_WARNING}*"
+    return (heading,) + tuple(f"   * **at {ev.time_str}:** {ev.name} at {ev.location}{markdown_warnings(ev)}"
+                              for ev in block.events)
+
+def text_warnings(ev):
+    warnings = [w for w, on in (("early event", ev.early), ("large event", ev.large)) if on]
+    return f" ({', '.join(warnings)})" if warnings else ""
+
+def text_block(block):
+    weekday, formatted_date = date_label(block.date)
+    if block.kind == "daily" or len(block.events) == 1:
+        return tuple(f"- {weekday} {formatted_date} at {ev.time_str}: {ev.name} at {ev.location}{text_warnings(ev)}"
+                     for ev in block.events)
+    heading = f"- {weekday} {formatted_date}, {len(block.events)} events"
+    heading += " (large combined events):" if block.combined else ":"
+    return (heading,) + tuple(f"    - at {ev.time_str}: {ev.name} at {ev.location}{text_warnings(ev)}"
+                              for ev in block.events)
+
+def html_warnings(ev):
+    return (f" <em>{EARLY_WARNING}</em>" if ev.early else "") + (f" <em>{LARGE_WARNING}</em>" if ev.large else "")
+
+def html_block(block):
+    weekday, formatted_date = date_label(block.date)
+    if block.kind == "daily" or len(block.events) == 1:
+        return tuple(f"<li><strong>{weekday}, {formatted_date} at {escape(ev.time_str)}:</strong> "
+                     f"{escape(ev.name)} at {escape(ev.location)}{html_warnings(ev)}</li>" for ev in block.events)
+    combined = f" <em>{COMBINED_WARNING}</em>" if block.combined else ""
+    return ((f"<li><strong>{weekday}, {formatted_date}</strong>, there are {len(block.events)} events:{combined}<ul>",)
+            + tuple(f"<li><strong>at {escape(ev.time_str)}:</strong> {escape(ev.name)} at {escape(ev.location)}{html_warnings(ev)}</li>"
+                    for ev in block.events)
+            + ("</ul></li>",))
+
+BLOCK_RENDERERS = {"markdown": markdown_block, "text": text_block, "html": html_block}
+
+@lru_cache(maxsize=CACHE_SIZE)
+def render_block(block, fmt="markdown"):
+    """The lines for one day in fmt ("markdown", "text" or "html"), rendered once per block."""
+    return BLOCK_RENDERERS[fmt](block)
+
+
+def markdown_lines(summary):
+    if is_quiet(summary):
+        lines = [f"## {summary.quiet_message}"] if summary.quiet_message else []
+    else:
+        lines = [f"## {summary.title}", ""]
+        for block in summary.blocks:
+            lines.extend(render_block(block, "markdown"))
+        if summary.kind == "weekly":
+            lines += ["", ""]
+    return lines + list(summary.notes)
+
+def text_lines(summary):
+    if is_quiet(summary):
+        lines = [summary.quiet_message] if summary.quiet_message else []
+    else:
+        lines = [summary.title, ""]
+        for block in summary.blocks:
+            lines.extend(render_block(block, "text"))
+    if summary.notes:
+        lines += [""] + list(summary.notes)
+    return lines
+
+def html_lines(summary):
+    if is_quiet(summary):
+        lines = [f"<h2>{escape(summary.quiet_message)}</h2>"] if summary.quiet_message else []
+    else:
+        lines = [f"<h2>{escape(summary.title)}</h2>", "<ul>"]
+        for block in summary.blocks:
+            lines.extend(render_block(block, "html"))
+        lines.append("</ul>")
+    return lines + [f"<p>{escape(note)}</p>" for note in summary.notes]
+
+def json_lines(summary):
+    quiet = is_quiet(summary)
+    document = {
+        "kind": summary.kind,
+        "title": summary.quiet_message if quiet else summary.title,
+        "quiet": quiet,
+        "days": [] if quiet else [{
+            "date": block.date.isoformat(),
+            "combined": block.combined,
+            "events": [ev._asdict() for ev in block.events],
+        } for block in summary.blocks],
+        "notes": list(summary.notes),
+    }
+    return [json.dumps(document, ensure_ascii=False)]
+
+SUMMARY_RENDERERS = {"markdown": markdown_lines, "text": text_lines, "html": html_lines, "json": json_lines}
+
+@lru_cache(maxsize=CACHE_SIZE)
+def render_lines(summary, fmt="markdown"):
+    """
+    The summary's lines in fmt, as a tuple. The daily summary has no lines on a quiet
+    day. JSON comes back as a single line holding the whole document.
+    """
+    return tuple(SUMMARY_RENDERERS[fmt](summary))
+
+def render(summary, fmt="markdown"):
+    """The summary as one string in fmt, e.g. an HTML email body or a JSON document."""
+    return "\n".join(render_lines(summary, fmt))
+
+
+def chunk_message(summary_lines, limit=MESSAGE_LIMIT):
+    message_chunks = []
+    chunk = ""
+    for line in summary_lines:
+        if len(chunk) + len(line) + 1 > limit:
+            message_chunks.append(chunk)
+            chunk = ""
+        chunk += line + "\n"
+    if chunk:
+        message_chunks.append(chunk)
+    return message_chunks
+
+@lru_cache(maxsize=CACHE_SIZE)
+def discord_chunks(summary, limit=MESSAGE_LIMIT):
+    """The summary's markdown split into Discord-sized messages, worked out once per summary."""
+    return tuple(chunk_message(render_lines(summary, "markdown"), limit))
@@ -0,0 +1,113 @@
+import calendar
+from collections import namedtuple
+from datetime import date
+from event_store import cache_path, read_cache, write_cache
+
+
+# Precomputed per-day and per-hour aggregates, kept in the CSV folder
+ROLLUP_FILE = ".rollups.pickle"
+ROLLUP_VERSION = 1
+
+# Thresholds the alert flags are based on
+EARLY_EVENT_HOUR = 18
+LARGE_EVENT_ATTENDANCE = 50000
+
+# One day's aggregates. peak is the largest combined crowd while two or more event
+# windows overlap (0 on days where none do), hourly_events counts events starting in
+# each hour and hourly_peak is the peak concurrent crowd in the sports complex during
+# each hour, a single event included.
+DayRollup = namedtuple("DayRollup", [
+    "date", "events", "attendance", "early", "large", "combined", "peak", "hourly_events", "hourly_peak",
+])
+
+
+def month_rollups(index, year, month):
+    """Aggregates for every day of the month that has at least one event."""
+    # numpy is only needed when a month gets rebuilt, cached rollups load without it
+    import numpy as np
+    from overlap import column, daily_peaks, hourly_load
+
+    first = date(year, month, 1)
+    last = date(year, month, calendar.monthrange(year, month)[1])
+    rows = index.positions(first, last)
+    if len(rows) == 0:
+        return {}
+
+    days = column(index.days)[rows.start:rows.stop].astype(np.int64) - first.toordinal()
+    minutes = column(index.minutes)[rows.start:rows.stop].astype(np.int64)
+    attendance = column(index.attendance)[rows.start:rows.stop].astype(np.int64)
+    n_days = last.day
+    timed = minutes >= 0
+
+    events = np.bincount(days, minlength=n_days)
+    total = np.bincount(days, weights=attendance, minlength=n_days).astype(np.int64)
+    early = np.bincount(days[timed & (minutes < EARLY_EVENT_HOUR * 60)], minlength=n_days) > 0
+    large = np.bincount(days[attendance > LARGE_EVENT_ATTENDANCE], minlength=n_days) > 0
+    hourly_events = np.zeros((n_days, 24), dtype=np.int64)
+    np.add.at(hourly_events, (days[timed], minutes[timed] // 60), 1)
+    hourly_peak = hourly_load(index, first, last)
+    peaks = daily_peaks(index, first, last)
+
+    rollups = {}
+    for i in np.flatnonzero(events):
+        day = date(year, month, int(i) + 1)
+        peak = peaks.get(day, 0)
+        rollups[day] = DayRollup(
+            day,
+            int(events[i]),
+            int(total[i]),
+            bool(early[i]),
+            bool(large[i]),
+            peak > LARGE_EVENT_ATTENDANCE,
+            peak,
+            tuple(int(n) for n in hourly_events[i]),
+            tuple(int(n) for n in hourly_peak[i]),
+        )
+    return rollups
+
+def next_month(year, month):
+    return (year + 1, 1) if month == 12 else (year, month + 1)
+
+def load_rollups(index, rollup_file=ROLLUP_FILE):
+    """
+    Returns {date: DayRollup} for every day with events in the index. Each month's
+    rollups are stored with the signature of the month file they came from and only
+    rebuilt when that file changes. A changed month also rebuilds the month after it,
+    since late events can spill into its first day. Returns None when a month needs
+    building and numpy isn't installed.
+    """
+    rollup_file = cache_path(index.folder, rollup_file)
+    cache = read_cache(rollup_file, ROLLUP_VERSION)
+    stored = cache["months"] if cache else {}
+
+    signatures = index.signatures or {ym: None for ym in index.months}
+    stale = {ym for ym, sig in signatures.items() if ym not in stored or stored[ym][0] != sig}
+    stale |= {next_month(*ym) for ym in stale if next_month(*ym) in signatures}
+
+    months = {}
+    try:
+        for ym, sig in signatures.items():
+            if ym in stale or not index.signatures:
+                months[ym] = (sig, month_rollups(index, *ym))
+            else:
+                months[ym] = stored[ym]
+    except ImportError:
+        # numpy isn't installed, the summaries work without rollups
+        return None
+
+    if rollup_file and index.signatures and (stale or stored.keys() != months.keys()):
+        write_cache(rollup_file, ROLLUP_VERSION, {"months": months})
+
+    rollups = {}
+    for _, month_days in months.values():
+        rollups.update(month_days)
+    return rollups
+
+def outlook(rollups, start, end):
+    """Rollups for the days in start..end (inclusive dates) that have any events."""
+    days = []
+    for ordinal in range(start.toordinal(), end.toordinal() + 1):
+        day = rollups.get(date.fromordinal(ordinal))
+        if day:
+            days.append(day)
+    return days
@@ -0,0 +1,65 @@
+from collections import defaultdict
+from datetime import timedelta
+from alerts import AlertFilter, DEFAULT_FILTER, daily_digest, weekly_digest
+from render import discord_chunks
+
+
+# Summary builder for each kind of subscription
+SUMMARIES = {"daily": daily_digest, "weekly": weekly_digest}
+
+
+def subscription_filter(sub):
+    """
+    The AlertFilter for one subscription dict, e.g.
+      {"channel_id": 123, "kind": "weekly", "venues": ["LFF", "CBP"], "large_attendance": 40000}
+    Anything left out falls back to DEFAULT_FILTER.
+    """
+    venues = sub.get("venues")
+    return AlertFilter(
+        frozenset(venues) if venues is not None else None,
+        sub.get("early_hour", DEFAULT_FILTER.early_hour),
+        sub.get("large_attendance", DEFAULT_FILTER.large_attendance),
+        sub.get("combined_attendance", DEFAULT_FILTER.combined_attendance),
+        sub.get("lookahead_days", DEFAULT_FILTER.lookahead_days),
+    )
+
+def group_subscriptions(subscriptions, kind):
+    """Groups the channel ids of every subscription of this kind by their shared filter."""
+    groups = defaultdict(list)
+    for sub in subscriptions:
+        if sub.get("kind", "daily") == kind:
+            groups[subscription_filter(sub)].append(sub["channel_id"])
+    return groups
+
+def build_digests(subscriptions, kind, index, today, rollups=None):
+    """
+    The Summary for every subscription of this kind, as {channel_id: Summary}.
+
+    The events every subscriber could need are pulled out of the index in one range
+    lookup, and each distinct filter is then evaluated once against that small window,
+    however many channels share it. Filters that come out with the same days share
+    their rendered text through render's caches.
+    """
+    groups = group_subscriptions(subscriptions, kind)
+    if not groups:
+        return {}
+
+    # The window starts a day early so overlap detection sees late events spilling past midnight
+    lookahead = 0 if kind == "daily" else max(f.lookahead_days for f in groups)
+    window = index.window(today - timedelta(days=1), today + timedelta(days=lookahead))
+
+    summary = SUMMARIES[kind]
+    digests = {}
+    for alert_filter, channel_ids in groups.items():
+        digest = summary(window, today, rollups, alert_filter)
+        for channel_id in channel_ids:
+            digests[channel_id] = digest
+    return digests
+
+def build_chunks(subscriptions, kind, index, today, rollups=None):
+    """
+    The Discord messages for every subscription of this kind, as {channel_id: chunks},
+    ready to send as they are. Channels with an empty summary get no chunks.
+    """
+    return {channel_id: discord_chunks(digest)
+            for channel_id, digest in build_digests(subscriptions, kind, index, today, rollups).items()}
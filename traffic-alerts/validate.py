@@ -0,0 +1,105 @@
+import csv
+import calendar
+from collections import namedtuple
+from event_store import cache_path, find_month_files, file_signature, read_cache, write_cache
+from normalize import CSV_FIELDS, LOCATION_MAP, normalize_time_display, parse_minute
+
+
+# Checks every month CSV against the Date,Time,Location,Event Name,Attendance layout
+# in one streaming pass per file, instead of the alert scripts quietly skipping rows
+# they can't read. Errors are rows the scripts drop or misread, warnings are rows that
+# still show up but look off. Results are kept per file keyed by mtime and size, so
+# after a sync only the months that changed get read again.
+
+VALIDATION_FILE = ".validation-cache.pickle"
+VALIDATION_VERSION = 1
+
+ERROR = "error"
+WARNING = "warning"
+
+# line is the file's line number (1 is the header), column the CSV field name or None
+Issue = namedtuple("Issue", ["file", "line", "column", "value", "message", "severity"])
+
+
+def check_row(fields, year, month):
+    """(column, value, message, severity) for everything wrong with one row of the month."""
+    problems = []
+    if len(fields) < len(CSV_FIELDS):
+        problems.append((None, ",".join(fields), f"expected {len(CSV_FIELDS)} fields, got {len(fields)}, the row gets skipped", ERROR))
+    elif len(fields) > len(CSV_FIELDS):
+        problems.append((None, ",".join(fields), f"expected {len(CSV_FIELDS)} fields, got {len(fields)}", WARNING))
+    # Missing fields were reported above, the checks below only look at the ones there
+    day, time_str, venue, name, attendance = (fields + [None] * len(CSV_FIELDS))[:len(CSV_FIELDS)]
+
+    if day is not None:
+        try:
+            day_number = int(day)
+        except ValueError:
+            problems.append(("Date", day, "not a day of the month, the row gets skipped", ERROR))
+        else:
+            days_in_month = calendar.monthrange(year, month)[1]
+            if not 1 <= day_number <= days_in_month:
+                problems.append(("Date", day, f"{year}-{month:02d} only has {days_in_month} days, the row gets skipped", ERROR))
+
+    if time_str is not None and parse_minute(normalize_time_display(time_str)) is None:
+        problems.append(("Time", time_str, "not a time like 6:30 PM, the early event warning won't apply", ERROR))
+
+    if venue is not None and venue not in LOCATION_MAP:
+        problems.append(("Location", venue, "unknown venue code, shown as is", WARNING))
+
+    if name is not None and not name.strip():
+        problems.append(("Event Name", name, "empty event name", ERROR))
+
+    if attendance is not None:
+        try:
+            if int(attendance) < 0:
+                problems.append(("Attendance", attendance, "negative attendance", ERROR))
+        except ValueError:
+            problems.append(("Attendance", attendance, "not a whole number, the row gets skipped", ERROR))
+    return problems
+
+def validate_month(path, year, month):
+    """Yields an Issue for every problem in one month CSV, in file order."""
+    file = str(path)
+    with open(path, newline='', encoding='utf-8') as csvfile:
+        reader = csv.reader(csvfile)
+        header = next(reader, None)
+        if header != CSV_FIELDS:
+            yield Issue(file, 1, None, ",".join(header or []), f"header should be {','.join(CSV_FIELDS)}", ERROR)
+            return
+        for fields in reader:
+            if not fields:
+                continue
+            for column, value, message, severity in check_row(fields, year, month):
+                yield Issue(file, reader.line_num, column, value, message, severity)
+
+def validate_folder(csv_folder, cache_file=VALIDATION_FILE):
+    """
+    {(year, month): [Issue]} for every month file in csv_folder. Only files whose mtime
+    or size changed since the last run are read. Pass cache_file=None to read them all.
+    """
+    cache_file = cache_path(csv_folder, cache_file)
+    cache = read_cache(cache_file, VALIDATION_VERSION)
+    cached = cache["months"] if cache else {}
+
+    months = {}
+    changed = False
+    for ym, path in sorted(find_month_files(csv_folder).items()):
+        signature = file_signature(path)
+        if ym in cached and cached[ym][0] == signature:
+            months[ym] = cached[ym]
+            continue
+        months[ym] = (signature, list(validate_month(path, *ym)))
+        changed = True
+
+    if cache_file and (changed or months.keys() != cached.keys()):
+        write_cache(cache_file, VALIDATION_VERSION, {"months": months})
+    return {ym: issues for ym, (signature, issues) in months.items()}
+
+def errors(results):
+    """Just the errors out of validate_folder's results, in month order."""
+    return [issue for ym in sorted(results) for issue in results[ym] if issue.severity == ERROR]
+
+def format_issue(issue):
+    column = f" {issue.column}" if issue.column else ""
+    return f"{issue.file}:{issue.line}:{column} {issue.severity}: {issue.message} ({issue.value!r})"
@@ -1,10 +1,22 @@
 import os
+import sys
 import json
+import time
+import hashlib
 import requests
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 from pdf2image import convert_from_path
 from urllib.parse import urlparse
-import asyncio
-import discord
+from pdf_cache import DownloadCache
+from pdf_extract import extract_calendar, write_csv
+from calendar_links import parse_calendar_month
+
+# The notifier is shared with the alert scripts
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "traffic-alerts"))
+from notifier import DiscordNotifier
+from instrument import span, count, record
+from event_store import cache_path, read_month_file
+from calendar_diff import SNAPSHOT_FILE, SnapshotStore, format_changes
 
 # Your Discord credentials
 DISCORD_TOKEN = 'XXXXXXXXXXXXXXXXXX'
@@ -15,72 +27,188 @@ CHANNEL_ID_debugging = XXXXXXXXXXXXXX  # BB debugging channel
 JSON_FILE = "0-cal-urls.json"
 OUTPUT_DIR = "calendars"
 POPPLER_PATH = "/usr/bin"  # Adjust if poppler is installed elsewhere
+SAVE_PNG = True  # The PNG is only for checking the extracted csv by eye, set to False to skip rasterizing
+
+# Downloads are network bound and run in threads, conversions are CPU bound and run in processes
+MAX_DOWNLOADS = 4
+MAX_CONVERSIONS = os.cpu_count() or 2
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+DOWNLOAD_TIMEOUT = 60
+
+
+def calendar_pdfs(data):
+    """Yields (url, base_filename, base_name, (year, month)) for every PDF entry in data."""
+    for entry in data:
+        url = entry.get("url", "").replace("\\", "")
+        if not url.lower().endswith(".pdf"):
+            continue
+
+        # Extract base filename from URL
+        url_path = urlparse(url).path
+        base_filename = os.path.basename(url_path)  # Example: May2024_v2.pdf
+        base_name, _ = os.path.splitext(base_filename)  # Example: May2024_v2
+        yield url, base_filename, base_name, parse_calendar_month(entry.get("month", ""))
+
+def download_pdf(session, url, pdf_path, headers):
+    """
+    Streams url to pdf_path, sending the cached validators in headers. Returns None if
+    the server answered 304 Not Modified, otherwise (sha256, etag, last_modified).
+    """
+    with span("download_pdf"), session.get(url, headers=headers, stream=True, timeout=DOWNLOAD_TIMEOUT) as response:
+        if response.status_code == 304:
+            return None
+        response.raise_for_status()
+        print(f"Downloading: {url}")
+        # Stream straight to disk so a large PDF is never held in memory whole
+        digest = hashlib.sha256()
+        tmp_path = pdf_path + ".part"
+        try:
+            with open(tmp_path, 'wb') as f:
+                for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    digest.update(chunk)
+                    f.write(chunk)
+        except BaseException:
+            # Don't leave half a PDF behind when the stream breaks off
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        count("bytes_downloaded", os.path.getsize(tmp_path))
+        os.replace(tmp_path, pdf_path)
+        return digest.hexdigest(), response.headers.get("ETag"), response.headers.get("Last-Modified")
+
+def convert_pdf(pdf_path, base_name, year_month):
+    # Runs in a worker process. Returns whether everything asked for was produced,
+    # whether the CSV was written this time, and how long it took since the worker
+    # can't report its own timings.
+    started = time.perf_counter()
+    converted = True
+    extracted = False
+
+    # Pull the events straight out of the PDF's text layer into a CSV
+    if year_month:
+        try:
+            rows = extract_calendar(pdf_path, *year_month)
+            write_csv(rows, os.path.join(OUTPUT_DIR, f"{base_name}.csv"))
+            print(f"Extracted {len(rows)} events to {base_name}.csv")
+            extracted = True
+        except Exception as e:
+            print(f"Error extracting events from {os.path.basename(pdf_path)}: {e}")
+            converted = False
+
+    if SAVE_PNG:
+        print(f"Converting {os.path.basename(pdf_path)} to PNG...")
+        try:
+            images = convert_from_path(pdf_path, poppler_path=POPPLER_PATH)
+            for i, img in enumerate(images):
+                # Naming PNG file the same as the PDF's name
+                img_filename = f"{base_name}.png"
+                img.save(os.path.join(OUTPUT_DIR, img_filename), "PNG")
+            print(f"Saved PNG file {base_name}.png")
+
+        except Exception as e:
+            print(f"Error converting {os.path.basename(pdf_path)}: {e}")
+            converted = False
 
-# Ensure output folder exists
-os.makedirs(OUTPUT_DIR, exist_ok=True)
+    # Remove the downloaded PDF file after conversion
+    os.remove(pdf_path)
+    print(f"Removed {pdf_path} after conversion")
+    return converted, extracted, time.perf_counter() - started
 
-# Load URLs from JSON
-with open(JSON_FILE, 'r') as f:
-    data = json.load(f)
+def main():
+    # Ensure output folder exists
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-async def send_message(base_name):
-    client = discord.Client(intents=discord.Intents.default())
+    # Load URLs from JSON
+    with open(JSON_FILE, 'r') as f:
+        data = json.load(f)
 
-    @client.event
-    async def on_ready():
-        channel = client.get_channel(CHANNEL_ID_debugging)
-        if channel:
-            await channel.send(f"A new calendar version {base_name} was found and downloaded.")
-        await client.close()
+    # New calendar messages are sent together at the end, over a single login
+    notifier = DiscordNotifier(DISCORD_TOKEN)
+    cache = DownloadCache(OUTPUT_DIR)
+    # Last extracted version of each month, so a new version only reports what changed
+    snapshots = SnapshotStore(cache_path(OUTPUT_DIR, SNAPSHOT_FILE))
+    session = requests.Session()
 
+    # Whatever was downloaded and converted before something went wrong is still remembered
     try:
-        await client.start(DISCORD_TOKEN)
+        with span("download_convert"), ThreadPoolExecutor(MAX_DOWNLOADS) as downloads, ProcessPoolExecutor(MAX_CONVERSIONS) as conversions:
+            download_futures = {}
+            for url, base_filename, base_name, year_month in calendar_pdfs(data):
+                pdf_path = os.path.join(OUTPUT_DIR, base_filename)
+                future = downloads.submit(download_pdf, session, url, pdf_path, cache.conditional_headers(url))
+                download_futures[future] = (url, pdf_path, base_name, year_month)
+
+            # Each PDF is handed to the conversion pool as soon as its own download finishes
+            conversion_futures = {}
+            converting = {}  # sha256 -> PNG for conversions submitted this run
+            for future in as_completed(download_futures):
+                url, pdf_path, base_name, year_month = download_futures[future]
+                try:
+                    downloaded = future.result()
+                except Exception as e:
+                    print(f"Error downloading {url}: {e}")
+                    count("download_errors")
+                    continue
+                if downloaded is None:
+                    print(f"Skipping {url}, not modified since the last download.")
+                    count("pdfs_not_modified")
+                    continue
+                count("pdfs_downloaded")
+
+                sha256, etag, last_modified = downloaded
+                png = f"{base_name}.png"
+                known_png = cache.png_for_hash(sha256) or converting.get(sha256)
+                # Same content as a calendar we already converted (possibly under another name),
+                # or a PNG left over from before the index existed
+                if known_png or (url not in cache.urls and os.path.exists(os.path.join(OUTPUT_DIR, png))):
+                    print(f"Skipping conversion for {url}, content already converted to {known_png or png}.")
+                    cache.record(url, sha256, known_png or png, etag, last_modified)
+                    os.remove(pdf_path)
+                    count("pdfs_already_converted")
+                    continue
+
+                converting[sha256] = png
+                conversion = conversions.submit(convert_pdf, pdf_path, base_name, year_month)
+                conversion_futures[conversion] = (url, pdf_path, sha256, png, etag, last_modified, base_name, year_month)
+
+            for future in as_completed(conversion_futures):
+                url, pdf_path, sha256, png, etag, last_modified, base_name, year_month = conversion_futures[future]
+                # A failed conversion isn't recorded, so the next run downloads it again
+                try:
+                    converted, extracted, seconds = future.result()
+                except Exception as e:
+                    # e.g. a worker that died on a corrupt PDF and took the pool down with it
+                    print(f"Error converting {url}: {e}")
+                    count("conversion_errors")
+                    if os.path.exists(pdf_path):
+                        os.remove(pdf_path)
+                    notifier.queue(CHANNEL_ID_debugging, f"Converting {base_name} crashed ({e}), it will be downloaded again next run.")
+                    continue
+                record("convert_pdf", seconds, not converted)
+                if converted:
+                    cache.record(url, sha256, png, etag, last_modified)
+                # lets me know there's a new version of the calendar so I can check the extracted csv before it replaces the month's file
+                if extracted:
+                    notifier.queue(CHANNEL_ID_debugging, f"A new calendar version {base_name} was found and downloaded, events extracted to {base_name}.csv.")
+                elif year_month is None:
+                    notifier.queue(CHANNEL_ID_debugging, f"A new calendar version {base_name} was found and downloaded, but its month couldn't be read so no events were extracted.")
+                else:
+                    notifier.queue(CHANNEL_ID_debugging, f"A new calendar version {base_name} was found and downloaded, but extracting its events failed.")
+                if not converted:
+                    notifier.queue(CHANNEL_ID_debugging, f"Converting {base_name} failed, it will be downloaded again next run.")
+                if extracted:
+                    csv_path = os.path.join(OUTPUT_DIR, f"{base_name}.csv")
+                    changes = snapshots.update(year_month, read_month_file(csv_path, *year_month))
+                    if changes:
+                        notifier.queue_lines(CHANNEL_ID_debugging, format_changes(year_month, changes))
+                    elif changes is not None:
+                        notifier.queue(CHANNEL_ID_debugging, f"{base_name} has the same events as the previous version.")
     finally:
-        await client.close()  # Ensure the client is properly closed
-
-# Loop through all entries
-for entry in data:
-    month = entry.get("month", "").replace("/", "-")
-    url = entry.get("url", "").replace("\\", "")
-    if not url.lower().endswith(".pdf"):
-        continue
-
-    # Extract base filename from URL
-    url_path = urlparse(url).path
-    base_filename = os.path.basename(url_path)  # Example: May2024_v2.pdf
-    base_name, _ = os.path.splitext(base_filename)  # Example: May2024_v2
-
-    # Check if a PNG file already exists for this download
-    png_files = [f for f in os.listdir(OUTPUT_DIR) if f.startswith(base_name) and f.endswith(".png")]
-    if png_files:
-        print(f"Skipping download for {url}, PNG file already exists.")
-        continue
-
-    print(f"Downloading: {url}")
-    pdf_path = os.path.join(OUTPUT_DIR, base_filename)
-
-    # Download PDF
-    response = requests.get(url)
-    with open(pdf_path, 'wb') as f:
-        f.write(response.content)
-
-    print(f"Converting {base_filename} to PNG...")
-    try:
-        images = convert_from_path(pdf_path, poppler_path=POPPLER_PATH)
-        for i, img in enumerate(images):
-            # Naming PNG file the same as the PDF's name
-            img_filename = f"{base_name}.png"
-            img.save(os.path.join(OUTPUT_DIR, img_filename), "PNG")
-        print(f"Saved PNG file {base_name}.png")
+        cache.save()
+        snapshots.save()
 
-    except Exception as e:
-        print(f"Error converting {base_filename}: {e}")
-
-    # Remove the downloaded PDF file after conversion
-    os.remove(pdf_path)
-    print(f"Removed {pdf_path} after conversion")
+    if DISCORD_TOKEN != "YOUR_DISCORD_BOT_TOKEN":
+        notifier.send()
 
-    # Send the message after the file is processed
-    # this currently serves to let me know that there's a new version of the calendar and I should manually update my csv version
-    # if the automatic conversion worked this would not be necessary
-    asyncio.run(send_message(base_name))
+if __name__ == '__main__':
+    main()
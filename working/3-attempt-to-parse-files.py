@@ -1,93 +1,46 @@
-import re
+from calendar_tokenizer import tokenize_entries, CalendarEntry
 
 def parse_entries(filename):
+    """
+    Reads the copied calendar text and splits it into parsed entries and the
+    pieces of text that couldn't be parsed.
+    """
     with open(filename, 'r') as f:
         text = f.read()
-    
-    # Find the start of the calendar entries using the header string.
-    header_str = "SUN MON TUES WED THURS FRI SAT"
-    start_index = text.find(header_str)
-    if start_index != -1:
-        content = text[start_index + len(header_str):]
-    else:
-        content = text  # fallback if header not found
-    
-    # Each entry is assumed to end at a closing parenthesis.
-    entries = re.findall(r'(.*?\))', content, flags=re.DOTALL)
-    
-    # Clean up each entry (remove extra whitespace/newlines)
-    cleaned_entries = [" ".join(entry.split()) for entry in entries if entry.strip()]
-    return cleaned_entries
 
-def parse_entry(entry):
-    """
-    Parses an individual entry into a dictionary with keys:
-      - date: Everything between the end of any previous ')' and the first time token,
-              with all letters removed.
-      - time: The first time token found. If a range is present, only the first token is kept.
-      - event: The text after the (optional) time range and before the attendance.
-      - attendance: The number from inside the final parentheses (with commas removed).
-    """
-    pattern = re.compile(
-        r"^(?:(?P<prefix>.*\))\s*)?"         # Optional leftover text ending with ')'
-        r"(?P<date>.*?)\b"                   # Date: everything up to time token
-        r"(?P<time>\d{1,2}(?::\d{2})?\s*(?:AM|PM))\b"  # Time token
-        r"(?:\s*(?:-|–)\s*(?:\d{1,2}(?::\d{2})?\s*(?:AM|PM))\b)?"  # Optional time range (ignored)
-        r"\s*(?P<event>.*?)\s*"              # Event text
-        r"\((?P<attendance>[\d,]+)\)\s*$",   # Attendance in parentheses
-        re.IGNORECASE
-    )
-    
-    match = pattern.match(entry)
-    if match:
-        # Capture date from regex and remove all letters.
-        date_str = match.group("date").strip()
-        date_str = re.sub(r"[A-Za-z]", "", date_str).strip()
-        if not date_str:
-            date_str = "0"
-        
-        # Capture time.
-        time_str = match.group("time").strip()
-        
-        # Capture event text.
-        event_str = match.group("event").strip()
-        
-        # Capture attendance and remove commas.
-        attendance_str = match.group("attendance").replace(",", "").strip()
-        
-        return {"date": date_str, "time": time_str, "event": event_str, "attendance": attendance_str}
-    else:
-        # Fallback: if regex fails, perform a simpler splitting approach.
-        parts = entry.split()
-        date_str = parts[0] if parts and parts[0].isdigit() else "0"
-        time_str = ""
-        event_str = entry
-        attendance_str = ""
-        return {"date": date_str, "time": time_str, "event": event_str, "attendance": attendance_str}
+    entries = []
+    failures = []
+    for record in tokenize_entries(text):
+        if isinstance(record, CalendarEntry):
+            entries.append(record)
+        else:
+            failures.append(record)
+    return entries, failures
 
-def print_table(entries):
+def print_table(entries, failures):
     """
     Prints a table where each row is an event entry with columns:
-      - Date, Time, Event, Attendance
+      - Date, Time, Location, Event, Attendance
+    followed by anything that couldn't be parsed.
     """
-    header = f"{'Date':<15} {'Time':<10} {'Event':<50} {'Attendance':<12}"
+    header = f"{'Date':<6} {'Time':<10} {'Location':<10} {'Event':<50} {'Attendance':<12}"
     separator = "-" * len(header)
     print(header)
     print(separator)
-    
-    parsed_entries1 = []
+
     for entry in entries:
-        details = parse_entry(entry)
-        parsed_entries1.append(details)
-        print(f"{details['date']:<15} {details['time']:<10} {details['event']:<50} {details['attendance']:<12}")
-    #print(details)
-    return parsed_entries1
-    
+        print(f"{entry.date or '':<6} {entry.time:<10} {entry.venue:<10} {entry.event:<50} {entry.attendance:<12}")
+
+    if failures:
+        print()
+        print(f"Could not parse {len(failures)} entries:")
+        for failure in failures:
+            print(f"  at offset {failure.offset} ({failure.reason}): {failure.text}")
+
 def main():
     filename = "this-month.txt"
-    raw_entries = parse_entries(filename)
-    
-    parsed_entries1 = print_table(raw_entries)
+    entries, failures = parse_entries(filename)
+    print_table(entries, failures)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,30 @@
+import os
+import sys
+from pdf_extract import extract_calendar, write_csv
+from calendar_links import parse_calendar_month
+
+
+# Reads a calendar PDF's text layer directly and writes it out in the same
+# Date,Time,Location,Event Name,Attendance layout as the month CSVs.
+#
+#   python 3-parse-pdf-to-csv.py calendars/May2026_v2.pdf 05/2026 [2026-05.csv]
+
+def main():
+    if len(sys.argv) not in (3, 4):
+        print("Usage: 3-parse-pdf-to-csv.py <calendar.pdf> <MM/YYYY or may2026> [output.csv]")
+        sys.exit(1)
+
+    pdf_path, month_str = sys.argv[1], sys.argv[2]
+    year_month = parse_calendar_month(month_str)
+    if year_month is None:
+        print(f"Couldn't parse month '{month_str}'")
+        sys.exit(1)
+    year, month = year_month
+    csv_path = sys.argv[3] if len(sys.argv) == 4 else os.path.splitext(pdf_path)[0] + ".csv"
+
+    rows = extract_calendar(pdf_path, year, month)
+    write_csv(rows, csv_path)
+    print(f"Wrote {len(rows)} events from {pdf_path} to {csv_path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+import os
+import re
+import json
+import hashlib
+import calendar
+import datetime
+from html.parser import HTMLParser
+
+
+# Pulls the calendar entries ({"month": ..., "pdf_file": {"url": ...}}) out of the
+# Stadium Complex District page. The page embeds them as JSON, either in a <script> or
+# in an HTML attribute. The page is split up with html.parser, each JSON value found in
+# it is decoded once with raw_decode, and the decoded data is walked for entries.
+
+# Cache of the last page fetch, relative to the working directory
+LINK_CACHE_FILE = ".calendar-links-cache.json"
+
+# Where a JSON value can start inside script text or an attribute
+JSON_START = re.compile(r"[\[{]")
+
+# The old way of finding entries, kept for pages where no JSON value decodes
+ENTRY_PATTERN = re.compile(r'"month"\s*:\s*"([^"]+)"\s*,\s*"pdf_file"\s*:\s*\{(.*?)\}', re.DOTALL)
+URL_PATTERN = re.compile(r'"url"\s*:\s*"([^"]+)"')
+
+# "jan" -> 1 ... "dec" -> 12
+MONTH_NUMBERS = {abbr.lower(): i for i, abbr in enumerate(calendar.month_abbr) if abbr}
+
+def parse_month_str(month_str):
+    """
+    Parses a month string into a datetime object set to the first day of that month.
+    The month_str can be in two formats:
+    - "MM/YYYY" (e.g. "08/2003")
+    - "jan2024" using a three-letter abbreviation for the month (e.g. "jan2024")
+    Returns a datetime object or None on failure.
+    """
+    try:
+        # Remove any escape characters (backslashes)
+        month_str = month_str.replace("\\", "")
+        if "/" in month_str:
+            # Format example: "08/2003"
+            parts = month_str.split("/")
+            month = int(parts[0])
+            year = int(parts[1])
+            return datetime.datetime(year, month, 1)
+        else:
+            # Format example: "jan2024"
+            month = MONTH_NUMBERS.get(month_str[:3].lower())
+            if month is None:
+                return None
+            year = int(month_str[3:])
+            return datetime.datetime(year, month, 1)
+    except Exception as e:
+        print(f"Error parsing month string '{month_str}': {e}")
+        return None
+
+def parse_calendar_month(month_str):
+    """(year, month) for a calendar month as listed on the page ("08/2003" or "jan2024"), or None."""
+    parsed = parse_month_str(month_str)
+    return (parsed.year, parsed.month) if parsed else None
+
+def upcoming_links(links, today=None):
+    """The links for the current month, plus next month once it's within 6 days."""
+    # Get today's month and year as a datetime for comparison (set to the first of the month)
+    today = today or datetime.datetime.today()
+    reference_date = datetime.datetime(today.year, today.month, 1)
+
+    # Get the date for 6 days from today to determine if the next month should be included
+    six_days_later = today + datetime.timedelta(days=6)
+    next_month_date = datetime.datetime(six_days_later.year, six_days_later.month, 1)
+
+    results = []
+    for link in links:
+        entry_date = parse_month_str(link["month"])
+        if entry_date is None:
+            continue  # Skip entries with unparseable month format
+        if reference_date <= entry_date <= next_month_date:
+            results.append(link)
+    return results
+
+
+class EmbeddedDataParser(HTMLParser):
+    """Collects the text of every <script> and any attribute value that may hold JSON."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.chunks = []
+        self.in_script = False
+
+    def handle_starttag(self, tag, attrs):
+        self.in_script = tag == "script"
+        for _, value in attrs:
+            if value and "pdf_file" in value:
+                self.chunks.append(value)
+
+    def handle_endtag(self, tag):
+        if tag == "script":
+            self.in_script = False
+
+    def handle_data(self, data):
+        if self.in_script and "pdf_file" in data:
+            self.chunks.append(data)
+
+
+def json_values(text):
+    """Yields every JSON object or array embedded in text, outermost ones only."""
+    decoder = json.JSONDecoder()
+    pos = 0
+    while True:
+        match = JSON_START.search(text, pos)
+        if not match:
+            return
+        try:
+            value, end = decoder.raw_decode(text, match.start())
+        except ValueError:
+            # Not JSON from here (JavaScript code, say), try the next bracket
+            pos = match.start() + 1
+            continue
+        yield value
+        pos = end
+
+def walk_entries(value):
+    # Depth-first through decoded JSON for objects with both a month and a pdf_file
+    stack = [value]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, dict):
+            if "month" in item and "pdf_file" in item:
+                yield item
+                continue
+            stack.extend(reversed(list(item.values())))
+        elif isinstance(item, list):
+            stack.extend(reversed(item))
+
+def entry_link(entry):
+    month = str(entry["month"]).replace("\\", "")
+    pdf_file = entry["pdf_file"]
+    if isinstance(pdf_file, dict) and pdf_file.get("url"):
+        return {"month": month, "url": pdf_file["url"].replace("\\", "")}
+    if isinstance(pdf_file, str) and pdf_file.lower().endswith(".pdf"):
+        return {"month": month, "url": pdf_file.replace("\\", "")}
+    if pdf_file:
+        return {"month": month, "pdf_file": pdf_file}
+    return None  # no PDF uploaded for this month yet
+
+def extract_links(page):
+    """
+    Every calendar entry on the page as {"month", "url"} (or {"month", "pdf_file"} when
+    the entry has no URL), in page order.
+    """
+    parser = EmbeddedDataParser()
+    parser.feed(page)
+    parser.close()
+
+    links = []
+    for chunk in parser.chunks:
+        for value in json_values(chunk):
+            for entry in walk_entries(value):
+                link = entry_link(entry)
+                if link:
+                    links.append(link)
+    if links:
+        return links
+
+    # Nothing decoded, fall back to matching the raw text
+    for month, pdf_block in ENTRY_PATTERN.findall(page):
+        url = URL_PATTERN.search(pdf_block)
+        if url:
+            links.append({"month": month.replace("\\", ""), "url": url.group(1).replace("\\", "")})
+        else:
+            links.append({"month": month.replace("\\", ""), "pdf_file": pdf_block})
+    return links
+
+
+class LinkCache:
+    """
+    The page's validators and the links extracted from it last time. A repeat fetch
+    sends If-None-Match/If-Modified-Since, and a 304 (or a body identical to the last
+    one) reuses the stored links without parsing anything.
+    """
+
+    def __init__(self, path=LINK_CACHE_FILE):
+        self.path = path
+        try:
+            with open(path, "r") as f:
+                self.pages = json.load(f)
+        except (OSError, ValueError):
+            self.pages = {}
+
+    def conditional_headers(self, url):
+        entry = self.pages.get(url, {})
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def links(self, url, sha256=None):
+        entry = self.pages.get(url)
+        if entry is None or (sha256 is not None and entry.get("sha256") != sha256):
+            return None
+        return entry["links"]
+
+    def record(self, url, links, sha256, etag=None, last_modified=None):
+        self.pages[url] = {"etag": etag, "last_modified": last_modified, "sha256": sha256, "links": links}
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.pages, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+def fetch_links(session, url, cache, timeout=30):
+    """All calendar links on the page at url, asking the server only if it changed."""
+    response = session.get(url, headers=cache.conditional_headers(url), timeout=timeout)
+    if response.status_code == 304:
+        links = cache.links(url)
+        if links is not None:
+            return links
+        # We lost the links but kept validators somehow, ask again for the whole page
+        response = session.get(url, timeout=timeout)
+    response.raise_for_status()
+
+    sha256 = hashlib.sha256(response.content).hexdigest()
+    links = cache.links(url, sha256)
+    if links is None:
+        links = extract_links(response.text)
+    cache.record(url, links, sha256, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+    return links
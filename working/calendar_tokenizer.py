@@ -0,0 +1,102 @@
+import re
+from collections import namedtuple
+from pdf_extract import split_venue, normalize_time
+
+
+# Header that comes right before the calendar entries in the copied calendar text
+HEADER = "SUN MON TUES WED THURS FRI SAT"
+
+TIME = r"\d{1,2}(?::\d{2})?\s*(?:AM|PM)\b"
+
+# Every token the lexer knows about, tried in this order at each position
+TOKEN_PATTERN = re.compile(
+    rf"(?P<time>{TIME})(?:\s*[-–]\s*(?P<end_time>{TIME}))?"   # Start time with optional end time
+    r"|(?P<attendance>\(\s*[\d,]+\s*\))"                      # Attendance in parentheses
+    r"|(?P<number>\d+\b)"                                     # Bare number, a day when it's before a time
+    r"|(?P<word>[^\s(]+|\()",                                 # Anything else up to whitespace
+    re.IGNORECASE
+)
+WHITESPACE = re.compile(r"\s+")
+
+# A parsed calendar entry. date is None if no day number was seen before it.
+CalendarEntry = namedtuple("CalendarEntry", ["date", "time", "end_time", "venue", "event", "attendance"])
+
+# Text that couldn't be turned into an entry, with its offset in the input
+ParseFailure = namedtuple("ParseFailure", ["offset", "text", "reason"])
+
+# Lexer states
+EXPECT_TIME = 0
+IN_EVENT = 1
+
+
+def collapse(text):
+    return WHITESPACE.sub(" ", text).strip()
+
+def tokenize_entries(text):
+    """
+    Single pass over calendar text, yielding a CalendarEntry or ParseFailure for each
+    entry. An entry is "[day] time[-time] event (attendance)". A day number carries over
+    to the entries after it until the next one, and everything before the weekday
+    header is skipped.
+    """
+    start = text.find(HEADER)
+    pos = start + len(HEADER) if start != -1 else 0
+
+    state = EXPECT_TIME
+    day = None
+    segment_start = pos
+    time = end_time = None
+    event_start = 0
+    # Day number directly before the current position while inside an event
+    pending_day = None
+
+    for match in TOKEN_PATTERN.finditer(text, pos):
+        kind = match.lastgroup if match.lastgroup != "end_time" else "time"
+
+        if state == EXPECT_TIME:
+            if kind == "number":
+                number = int(match.group("number"))
+                if 1 <= number <= 31:
+                    day = number
+            elif kind == "time":
+                time, end_time = match.group("time"), match.group("end_time")
+                event_start = match.end()
+                pending_day = None
+                state = IN_EVENT
+            elif kind == "attendance":
+                yield ParseFailure(segment_start, collapse(text[segment_start:match.end()]), "attendance without a time")
+                segment_start = match.end()
+
+        elif kind == "attendance":
+            venue, event = split_venue(collapse(text[event_start:match.start()]))
+            attendance = int(match.group("attendance").strip("() ").replace(",", ""))
+            yield CalendarEntry(
+                day,
+                normalize_time(time),
+                normalize_time(end_time) if end_time else None,
+                venue,
+                event,
+                attendance,
+            )
+            state = EXPECT_TIME
+            segment_start = match.end()
+
+        elif kind == "time":
+            # A new time before the attendance closes the previous entry without one
+            failure_end = match.start()
+            if pending_day:
+                day, failure_end = pending_day
+            yield ParseFailure(segment_start, collapse(text[segment_start:failure_end]), "no attendance before the next time")
+            segment_start = failure_end
+            time, end_time = match.group("time"), match.group("end_time")
+            event_start = match.end()
+            pending_day = None
+
+        elif kind == "number" and 1 <= int(match.group("number")) <= 31:
+            pending_day = (int(match.group("number")), match.start())
+
+        else:
+            pending_day = None
+
+    if state == IN_EVENT:
+        yield ParseFailure(segment_start, collapse(text[segment_start:]), "text ended before the attendance")
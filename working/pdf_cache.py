@@ -0,0 +1,51 @@
+import os
+import json
+
+
+# Index of everything downloaded so far, kept inside the output folder
+INDEX_FILE = ".download-index.json"
+
+
+class DownloadCache:
+    """
+    Remembers, per calendar URL, the ETag/Last-Modified validators and the sha256 of
+    the PDF last downloaded from it, plus which PNG each content hash was converted to.
+    Repeat downloads send If-None-Match/If-Modified-Since, and a PDF whose content was
+    already converted under another name is recognised by its hash.
+    """
+
+    def __init__(self, folder, index_file=INDEX_FILE):
+        self.path = os.path.join(folder, index_file)
+        try:
+            with open(self.path, 'r') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            index = {}
+        self.urls = index.get("urls", {})
+        self.hashes = index.get("hashes", {})
+
+    def conditional_headers(self, url):
+        entry = self.urls.get(url)
+        if not entry:
+            return {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def png_for_hash(self, sha256):
+        return self.hashes.get(sha256)
+
+    def record(self, url, sha256, png, etag=None, last_modified=None):
+        self.urls[url] = {"etag": etag, "last_modified": last_modified, "sha256": sha256, "png": png}
+        if png:
+            self.hashes[sha256] = png
+
+    def save(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({"urls": self.urls, "hashes": self.hashes}, f, indent=2)
+        os.replace(tmp_path, self.path)
+
@@ -0,0 +1,165 @@
+import re
+import csv
+import calendar
+import datetime
+
+
+# Column headers across the top of the calendar grid, in order
+WEEKDAY_HEADERS = ["SUN", "MON", "TUES", "WED", "THURS", "FRI", "SAT"]
+
+# Venue codes used in the CSVs, and the names the calendars spell out instead
+VENUE_CODES = {"CBP", "LFF", "WFC", "XF!", "XMA", "SL!"}
+VENUE_NAMES = {
+    "citizens bank park": "CBP",
+    "lincoln financial field": "LFF",
+    "wells fargo center": "WFC",
+    "xfinity mobile arena": "XMA",
+    "xfinity live": "XF!",
+    "stateside live": "SL!",
+}
+
+CSV_FIELDS = ["Date", "Time", "Location", "Event Name", "Attendance"]
+
+# Words whose tops are within this many points are treated as the same line
+LINE_TOLERANCE = 3
+
+TIME = r"\d{1,2}(?::\d{2})?\s*(?:AM|PM)"
+ENTRY_PATTERN = re.compile(
+    rf"(?P<time>{TIME})"                       # Start time
+    rf"(?:\s*[-–]\s*{TIME})?"                  # Optional end time (ignored)
+    r"\s*(?P<event>.*?)\s*"                    # Event text
+    r"\((?P<attendance>[\d,]+)\)",             # Attendance in parentheses
+    re.IGNORECASE | re.DOTALL
+)
+VENUE_NAME_PATTERN = re.compile("|".join(re.escape(name) for name in VENUE_NAMES), re.IGNORECASE)
+
+
+def weekday_column(year, month, day):
+    # Calendar columns start on Sunday, datetime weeks start on Monday
+    return (datetime.date(year, month, day).weekday() + 1) % 7
+
+def find_header(words):
+    """Returns the header words left to right, or None if this page has no grid header."""
+    by_text = {}
+    for word in words:
+        text = word["text"].upper()
+        if text in WEEKDAY_HEADERS and text not in by_text:
+            by_text[text] = word
+    if len(by_text) != len(WEEKDAY_HEADERS):
+        return None
+    return [by_text[text] for text in WEEKDAY_HEADERS]
+
+def column_edges(header):
+    # Columns split halfway between neighbouring header centres
+    centres = [(w["x0"] + w["x1"]) / 2 for w in header]
+    return [(a + b) / 2 for a, b in zip(centres, centres[1:])]
+
+def column_of(word, edges):
+    centre = (word["x0"] + word["x1"]) / 2
+    for col, edge in enumerate(edges):
+        if centre < edge:
+            return col
+    return len(edges)
+
+def cell_text(words):
+    """Joins a cell's words in reading order, line by line."""
+    lines = []
+    for word in sorted(words, key=lambda w: (w["top"], w["x0"])):
+        if lines and abs(word["top"] - lines[-1][0]) <= LINE_TOLERANCE:
+            lines[-1][1].append(word)
+        else:
+            lines.append((word["top"], [word]))
+    return " ".join(
+        " ".join(w["text"] for w in sorted(line_words, key=lambda w: w["x0"]))
+        for _, line_words in lines
+    )
+
+def split_venue(text):
+    """Returns (venue code, text with the venue taken out)."""
+    tokens = text.split()
+    for i, token in enumerate(tokens):
+        if token.upper() in VENUE_CODES:
+            return token.upper(), " ".join(tokens[:i] + tokens[i + 1:])
+    match = VENUE_NAME_PATTERN.search(text)
+    if match:
+        rest = text[:match.start()] + text[match.end():]
+        return VENUE_NAMES[match.group(0).lower()], " ".join(rest.split())
+    return "unknown", text
+
+def normalize_time(time_str):
+    # "7 PM" -> "7:00pm", matching the newer month CSVs
+    time_str = time_str.lower().replace(" ", "")
+    if ":" not in time_str:
+        time_str = time_str[:-2] + ":00" + time_str[-2:]
+    return time_str
+
+def parse_cell(day, text):
+    rows = []
+    for match in ENTRY_PATTERN.finditer(text):
+        venue, event = split_venue(" ".join(match.group("event").split()))
+        rows.append({
+            "Date": day,
+            "Time": normalize_time(match.group("time")),
+            "Location": venue,
+            "Event Name": event,
+            "Attendance": match.group("attendance").replace(",", ""),
+        })
+    return rows
+
+def extract_page(words, year, month):
+    """
+    Maps one page's words onto the SUN-SAT grid and returns its rows. Day numbers are
+    recognised as bare integers sitting in the column their weekday belongs to, and
+    each day's cell runs from its number down to the next week's row of numbers.
+    """
+    header = find_header(words)
+    if header is None:
+        return []
+    grid_top = max(w["bottom"] for w in header)
+    edges = column_edges(header)
+    days_in_month = calendar.monthrange(year, month)[1]
+
+    grid_words = [w for w in words if w["top"] > grid_top]
+    columns = [column_of(w, edges) for w in grid_words]
+
+    markers = {}
+    for word, col in zip(grid_words, columns):
+        if not word["text"].isdigit():
+            continue
+        day = int(word["text"])
+        if 1 <= day <= days_in_month and day not in markers and weekday_column(year, month, day) == col:
+            markers[day] = word
+
+    # Each week row starts at the highest day number in it
+    week_tops = {}
+    for day, word in markers.items():
+        week = (day + weekday_column(year, month, 1) - 1) // 7
+        week_tops[week] = min(word["top"], week_tops.get(week, word["top"]))
+
+    rows = []
+    for day in sorted(markers):
+        marker = markers[day]
+        col = weekday_column(year, month, day)
+        week = (day + weekday_column(year, month, 1) - 1) // 7
+        bottom = week_tops.get(week + 1, float("inf"))
+        cell = [
+            w for w, c in zip(grid_words, columns)
+            if c == col and w is not marker and marker["top"] - LINE_TOLERANCE <= w["top"] < bottom - LINE_TOLERANCE
+        ]
+        rows.extend(parse_cell(day, cell_text(cell)))
+    return rows
+
+def extract_calendar(pdf_path, year, month):
+    """Reads the calendar PDF's text layer and returns its events as CSV rows."""
+    import pdfplumber  # only needed here, the text helpers above are used without it
+    rows = []
+    with pdfplumber.open(pdf_path) as pdf:
+        for page in pdf.pages:
+            rows.extend(extract_page(page.extract_words(), year, month))
+    return rows
+
+def write_csv(rows, csv_path):
+    with open(csv_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS, lineterminator="\n")
+        writer.writeheader()
+        writer.writerows(rows)